@@ -1,6 +1,9 @@
 from django.contrib import admin
-from .models import HouseListing, ScheduleVisit, Notification
+from .models import HouseListing, ScheduleVisit, Notification, NotificationArchive, EmailOutbox
 from django.utils.html import format_html
+from django.utils import timezone
+from .visits import approve_visits, reject_visits
+from .notifications import reconcile_unread_counts
 
 
 @admin.register(HouseListing)
@@ -76,33 +79,12 @@ class ScheduleVisitAdmin(admin.ModelAdmin):
     admin_notes_preview.short_description = 'Admin Notes'
 
     def approve_selected(self, request, queryset):
-        count = 0
-        for visit in queryset.filter(status='pending'):
-            visit.status = 'approved'
-            visit.save()
-            Notification.objects.create(
-                user=visit.user,
-                message=f"✅ Your visit to '{visit.house.title}' on {visit.visit_date} at {visit.visit_time} has been approved!",
-                link='/notifications/',
-                notification_type='success'
-            )
-            count += 1
+        count = approve_visits(queryset)
         self.message_user(request, f"{count} visit(s) approved and user(s) notified.")
     approve_selected.short_description = "Approve selected visits"
 
     def reject_selected(self, request, queryset):
-        count = 0
-        for visit in queryset.filter(status='pending'):
-            visit.status = 'rejected'
-            visit.admin_notes = visit.admin_notes or "Rejected by admin."
-            visit.save()
-            Notification.objects.create(
-                user=visit.user,
-                message=f"❌ Your visit to '{visit.house.title}' was rejected. Reason: {visit.admin_notes}",
-                link='/notifications/',
-                notification_type='alert'
-            )
-            count += 1
+        count = reject_visits(queryset)
         self.message_user(request, f"{count} visit(s) rejected and user(s) notified.")
     reject_selected.short_description = "Reject selected visits"
 
@@ -139,12 +121,58 @@ class NotificationAdmin(admin.ModelAdmin):
     is_read_badge.short_description = 'Status'
     is_read_badge.admin_order_field = 'is_read'
 
+    # Edits made here bypass the notifications service, so resync the affected counters.
+    # Users are collected before the change: afterwards an is_read filter no longer matches the rows.
+    def _user_ids(self, queryset):
+        return set(queryset.values_list('user_id', flat=True))
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        reconcile_unread_counts([obj.user_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        reconcile_unread_counts([obj.user_id])
+
+    def delete_queryset(self, request, queryset):
+        user_ids = self._user_ids(queryset)
+        super().delete_queryset(request, queryset)
+        reconcile_unread_counts(user_ids)
+
     def mark_as_read(self, request, queryset):
+        user_ids = self._user_ids(queryset)
         updated = queryset.update(is_read=True)
+        reconcile_unread_counts(user_ids)
         self.message_user(request, f"{updated} notification(s) marked as read.")
     mark_as_read.short_description = "Mark as read"
 
     def mark_as_unread(self, request, queryset):
+        user_ids = self._user_ids(queryset)
         updated = queryset.update(is_read=False)
+        reconcile_unread_counts(user_ids)
         self.message_user(request, f"{updated} notification(s) marked as unread.")
     mark_as_unread.short_description = "Mark as unread"
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('user', 'message', 'notification_type', 'created_at', 'archived_at')
+    list_filter = ('notification_type',)
+    search_fields = ('message', 'user__username')
+    readonly_fields = ('original_id', 'created_at', 'archived_at')
+    list_per_page = 20
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject', 'body')
+    readonly_fields = ('created_at', 'updated_at', 'sent_at', 'claim_token', 'last_error')
+    actions = ['retry_now']
+    list_per_page = 20
+
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(status='pending', next_attempt_at=timezone.now())
+        self.message_user(request, f"{updated} email(s) queued for retry.")
+    retry_now.short_description = "Retry now"
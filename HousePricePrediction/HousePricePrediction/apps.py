@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class HousePricePredictionConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'HousePricePrediction'
+
+    def ready(self):
+        # Keep the listing search index and image derivatives in sync with HouseListing
+        from . import listings, images  # noqa: F401
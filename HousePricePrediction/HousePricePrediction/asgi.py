@@ -13,4 +13,5 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HousePricePrediction.settings')
 
+# Serves the notification push stream (/notifications/stream/) as well as regular views
 application = get_asgi_application()
@@ -0,0 +1,137 @@
+import bisect
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+QUEUE_WAIT_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 25]
+
+
+class Histogram:
+    """Fixed-bucket histogram; each bucket counts observations <= its upper bound."""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            labels = [str(b) for b in self.buckets] + ['+Inf']
+            return {
+                'buckets': dict(zip(labels, self.counts)),
+                'count': self.count,
+                'sum': round(self.sum, 3),
+                'mean': round(self.sum / self.count, 3) if self.count else None,
+            }
+
+
+class _Pending:
+    __slots__ = ('row', 'future', 'enqueued')
+
+    def __init__(self, row):
+        self.row = row
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+class PredictionBatcher:
+    """Coalesces concurrent single-row predictions into one vectorized predict call.
+
+    ``predict_fn`` receives a list of rows and returns one prediction per row.
+    A batch is flushed when ``max_rows`` requests are waiting, ``max_wait_ms``
+    has passed since the first one arrived, or every caller currently inside
+    ``predict`` is already in the batch, whichever comes first. A lone request
+    therefore never waits for the window.
+    """
+
+    def __init__(self, predict_fn, max_wait_ms=2.0, max_rows=64, timeout=5.0):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_waits = Histogram(QUEUE_WAIT_BUCKETS_MS)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._callers = 0
+
+    def predict(self, row):
+        self._ensure_thread()
+        with self._lock:
+            self._callers += 1
+        try:
+            pending = _Pending(row)
+            self._queue.put(pending)
+            return pending.future.result(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._callers -= 1
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued + self.max_wait
+        while len(batch) < self.max_rows:
+            if self._queue.empty() and self._callers <= len(batch):
+                # Nobody else is on the way; waiting would only add latency
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.monotonic()
+            for pending in batch:
+                self.queue_waits.observe((started - pending.enqueued) * 1000)
+            self.batch_sizes.observe(len(batch))
+
+            try:
+                predictions = self.predict_fn([pending.row for pending in batch])
+            except Exception as e:
+                logger.error(f"Batched prediction failed: {str(e)}")
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+            for pending, prediction in zip(batch, predictions):
+                pending.future.set_result(prediction)
+
+    def stats(self):
+        return {
+            'max_wait_ms': self.max_wait * 1000,
+            'max_rows': self.max_rows,
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_wait_ms': self.queue_waits.snapshot(),
+        }
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .features import FEATURES
+from .inference import MIN_INCOME
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+
+
+class BulkInputError(ValueError):
+    pass
+
+
+def as_matrix(rows):
+    """Rows as an (n, 8) float matrix.
+
+    Rows of the wrong width are an error, not reshaped. Values that are not
+    numbers become NaN, so only that row is reported invalid, as with CSV.
+    """
+    if any(not isinstance(row, (list, tuple)) or len(row) != len(FEATURES) for row in rows):
+        raise BulkInputError(f"Each property needs {len(FEATURES)} numeric values")
+    if not rows:
+        return np.empty((0, len(FEATURES)))
+    return pd.DataFrame(rows).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def parse_bulk_request(request):
+    """Read a JSON or CSV body into an (n, 8) float matrix."""
+    if request.content_type in ('text/csv', 'application/csv'):
+        try:
+            frame = pd.read_csv(io.BytesIO(request.body))
+        except Exception as e:
+            raise BulkInputError(f"Invalid CSV: {str(e)}")
+        frame.columns = frame.columns.str.strip()
+        missing = [col for col in FEATURES if col not in frame.columns]
+        if missing:
+            raise BulkInputError(f"Missing columns: {', '.join(missing)}")
+        values = frame[FEATURES].apply(pd.to_numeric, errors='coerce')
+        return values.to_numpy(dtype=np.float64), 'csv'
+
+    try:
+        payload = json.loads(request.body or b'[]')
+    except json.JSONDecodeError as e:
+        raise BulkInputError(f"Invalid JSON: {str(e)}")
+
+    # Accept a bare list or {"properties": [...]}, rows as lists or feature dicts
+    rows = payload.get('properties', []) if isinstance(payload, dict) else payload
+    if not isinstance(rows, list):
+        raise BulkInputError("Expected a list of properties")
+    # A missing field is a bad value in that row only
+    rows = [[row.get(col) for col in FEATURES] if isinstance(row, dict) else row for row in rows]
+    return as_matrix(rows), 'json'
+
+
+def predict_batch(model, matrix, bounds):
+    """Validate, clamp and predict every row in one vectorized pass.
+
+    Returns the clamped inputs, a validity mask and predictions (NaN where invalid).
+    """
+    with np.errstate(invalid='ignore'):
+        valid = (matrix[:, 0] >= MIN_INCOME) & (matrix > 0).all(axis=1)
+
+    clamped = matrix.copy()
+    clamped[valid] = bounds.clip(matrix[valid])
+    clamped[:, 7] = np.round(clamped[:, 7])
+
+    predictions = np.full(len(matrix), np.nan)
+    if valid.any():
+        raw = model.predict(clamped[valid])
+        predictions[valid] = np.round(np.maximum(raw, 0), 2)
+    return clamped, valid, predictions
+
+
+def _row_error(row):
+    if np.isnan(row).any():
+        return "Please enter valid numbers"
+    if row[0] < MIN_INCOME:
+        return f"Average area income must be at least NPR {MIN_INCOME:,}"
+    return "Only positive numbers are allowed"
+
+
+def predict_chunks(matrix, predict, chunk_size=CHUNK_SIZE):
+    """Yield (start, rows, clamped, valid, predictions) per chunk, predicting each as it is reached."""
+    for start in range(0, len(matrix), chunk_size):
+        rows = matrix[start:start + chunk_size]
+        yield (start, rows) + tuple(predict(rows))
+
+
+def _chunks_or_failure(chunks):
+    """The chunks, then (row, None) if predicting one fails after the response has started."""
+    row, valid_count = 0, 0
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            logger.info(f"Bulk prediction: {row} rows, {valid_count} valid")
+            return
+        except Exception as e:
+            logger.error(f"Bulk prediction error at row {row}: {str(e)}")
+            yield row, None
+            return
+        row = chunk[0] + len(chunk[1])
+        valid_count += int(chunk[3].sum())
+        yield chunk
+
+
+def stream_json(chunks):
+    yield '{"results": ['
+    for chunk in _chunks_or_failure(chunks):
+        start, rows = chunk[0], chunk[1]
+        if rows is None:
+            yield f'], "error": "Prediction failed from row {start}"}}'
+            return
+        _, _, clamped, valid, predictions = chunk
+        items = []
+        for i in range(len(rows)):
+            if valid[i]:
+                item = {'row': start + i, 'price': float(predictions[i]), 'inputs': clamped[i].tolist()}
+            else:
+                item = {'row': start + i, 'error': _row_error(rows[i])}
+            items.append(json.dumps(item))
+        yield (',' if start else '') + ','.join(items)
+    yield ']}'
+
+
+def stream_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['row'] + FEATURES + ['Price', 'error'])
+    for chunk in _chunks_or_failure(chunks):
+        start, rows = chunk[0], chunk[1]
+        if rows is None:
+            writer.writerow([start] + [''] * len(FEATURES) + ['', f"Prediction failed from row {start}"])
+            break
+        _, _, clamped, valid, predictions = chunk
+        for i in range(len(rows)):
+            if valid[i]:
+                writer.writerow([start + i] + clamped[i].tolist() + [f"{predictions[i]:.2f}", ''])
+            else:
+                writer.writerow([start + i] + [''] * len(FEATURES) + ['', _row_error(rows[i])])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
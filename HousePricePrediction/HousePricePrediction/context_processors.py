@@ -0,0 +1,9 @@
+from .notifications import unread_count
+
+
+def notifications(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    # A callable, so the counter is only read by templates that show the badge
+    return {'unread_notification_count': lambda: unread_count(user)}
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), '.dataset_cache')
+
+
+def read_source(path):
+    """Parse the original workbook or CSV (slow; only done on a cache miss)."""
+    path = str(path)
+    if path.endswith('.csv'):
+        data = pd.read_csv(path)
+    elif path.endswith('.xlsx'):
+        data = pd.read_excel(path)
+    else:
+        raise ValueError("Unsupported file format. Please provide a .csv or .xlsx file.")
+    data.columns = data.columns.str.strip()
+    return data
+
+
+def _write_cache(data, target):
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        columns = []
+        for i, col in enumerate(data.columns):
+            values = data[col].to_numpy()
+            if values.dtype == object:
+                # Fixed-width unicode so the column can be memory-mapped too
+                values = data[col].fillna('').astype(str).to_numpy().astype('U')
+            np.save(os.path.join(tmp_dir, f"{i}.npy"), values, allow_pickle=False)
+            columns.append(col)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump({'format': CACHE_FORMAT, 'columns': columns, 'rows': len(data)}, f)
+        # mkdtemp creates 0700; web workers may run as a different user than the trainer
+        os.chmod(tmp_dir, 0o755)
+        try:
+            os.rename(tmp_dir, target)
+        except OSError:
+            # Another worker published the same version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _read_cache(target):
+    with open(os.path.join(target, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('format') != CACHE_FORMAT:
+        raise ValueError(f"Unsupported dataset cache format in {target}")
+    columns = {
+        col: np.load(os.path.join(target, f"{i}.npy"), mmap_mode='r', allow_pickle=False)
+        for i, col in enumerate(meta['columns'])
+    }
+    return pd.DataFrame(columns, copy=False)
+
+
+def _prune(cache_dir, keep):
+    for name in os.listdir(cache_dir):
+        if name != keep and not name.startswith('.tmp-'):
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+
+
+def dataset_version(path):
+    return file_sha256(path)[:16]
+
+
+def load_dataset(path, cache_dir=None):
+    """Load the dataset through a memory-mapped .npy cache keyed by the source file hash.
+
+    Returns (DataFrame, version). The first process to see a new source file
+    parses it and publishes the cache; everyone else maps the same pages.
+    """
+    path = str(path)
+    cache_dir = cache_dir or default_cache_dir(path)
+    version = dataset_version(path)
+    target = os.path.join(cache_dir, version)
+
+    if not os.path.exists(os.path.join(target, 'meta.json')):
+        logger.info(f"Building dataset cache for {path} ({version})")
+        data = read_source(path)
+        _write_cache(data, target)
+        _prune(cache_dir, keep=version)
+
+    return _read_cache(target), version
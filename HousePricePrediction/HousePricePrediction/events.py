@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the user's change marker (a file read, no query)
+MARKER_POLL_INTERVAL = 2
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+# Query the database anyway this often, in case a change left no marker (e.g. another host)
+RESYNC_INTERVAL = 300
+
+
+class NotificationBroker:
+    """Fans notification events out to the open push streams in this process."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=100)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(entry)
+        return entry
+
+    def unsubscribe(self, user_id, entry):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers:
+                subscribers.discard(entry)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id, event):
+        # Safe to call from sync code in any thread (e.g. a transaction.on_commit hook)
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, event)
+
+    @staticmethod
+    def _put(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client only needs the latest state
+            pass
+
+
+broker = NotificationBroker()
+
+
+# Change markers: one small file per user, rewritten whenever their notifications
+# change, so streams in every worker process on the host notice without a query.
+
+def _marker_path(user_id):
+    return os.path.join(settings.NOTIFICATION_MARKER_DIR, str(user_id))
+
+
+def touch_marker(user_id):
+    try:
+        os.makedirs(settings.NOTIFICATION_MARKER_DIR, exist_ok=True)
+        with open(_marker_path(user_id), 'w') as f:
+            f.write(uuid.uuid4().hex)
+    except OSError as e:
+        logger.warning(f"Notification marker write failed: {str(e)}")
+
+
+def read_marker(user_id):
+    try:
+        with open(_marker_path(user_id), 'r') as f:
+            return f.read()
+    except OSError:
+        return ''
+
+
+def serialize_notification(notification):
+    return {
+        'id': notification.id,
+        'message': notification.message,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.strftime('%b %d, %H:%M') if notification.created_at else '',
+        'link': notification.link if notification.link else '#',
+    }
+
+
+def publish_notifications(notifications):
+    for user_id in {notification.user_id for notification in notifications}:
+        touch_marker(user_id)
+    for notification in notifications:
+        broker.publish(notification.user_id, {
+            'type': 'notification',
+            'notification': serialize_notification(notification),
+        })
+
+
+def publish_unread_changed(user_id):
+    touch_marker(user_id)
+    broker.publish(user_id, {'type': 'unread'})
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _unread_state(user):
+    from .models import Notification
+    from .notifications import unread_count
+    latest = Notification.objects.filter(user=user).order_by('-id').values_list('id', flat=True).first()
+    return unread_count(user), latest
+
+
+async def notification_event_stream(user):
+    """Server-Sent Events for one user: unread-count updates and new notifications."""
+    from asgiref.sync import sync_to_async
+
+    entry = broker.subscribe(user.id)
+    _, queue = entry
+    try:
+        marker = read_marker(user.id)
+        state = await sync_to_async(_unread_state)(user)
+        yield 'retry: 5000\n\n'
+        yield format_event('unread', {'unread_count': state[0]})
+        last_sent = last_synced = time.monotonic()
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=MARKER_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                # Catch up on changes made by other worker processes, querying only when the marker moved
+                now = time.monotonic()
+                latest_marker = read_marker(user.id)
+                if latest_marker != marker or now - last_synced >= RESYNC_INTERVAL:
+                    marker, last_synced = latest_marker, now
+                    latest = await sync_to_async(_unread_state)(user)
+                    if latest != state:
+                        state, last_sent = latest, now
+                        yield format_event('unread', {'unread_count': state[0]})
+                        continue
+                if now - last_sent >= HEARTBEAT_INTERVAL:
+                    last_sent = now
+                    yield ': keep-alive\n\n'
+                continue
+
+            # Read before querying, so a change after the query still shows up as a new marker
+            marker = read_marker(user.id)
+            state = await sync_to_async(_unread_state)(user)
+            last_sent = time.monotonic()
+            if event['type'] == 'notification':
+                yield format_event('notification', {
+                    'unread_count': state[0],
+                    'notification': event['notification'],
+                })
+            else:
+                yield format_event('unread', {'unread_count': state[0]})
+    finally:
+        broker.unsubscribe(user.id, entry)
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# Feature columns the price model is trained on, in model input order
+FEATURES = [
+    'Avg. Area Income', 'Avg. Area House Age',
+    'Avg. Area Number of Rooms', 'Avg. Area Number of Bedrooms',
+    'Area Population', 'Build-up Area', 'Land Area', 'Floor'
+]
+
+TARGET = 'Price'
+
+
+def clean_rows(frame, features=FEATURES):
+    """Training-time cleaning: integer features and price, no negative rows."""
+    frame = frame.copy()
+    # Ensure prices and features are non-negative integers
+    frame[TARGET] = frame[TARGET].fillna(0).round().astype(int)
+    # Fill missing values in features with 0 before rounding/converting
+    frame[features] = frame[features].fillna(0).round().astype(int)
+
+    # Drop rows with negative values (if any)
+    frame = frame[(frame[features] >= 0).all(axis=1)]
+    return frame[frame[TARGET] >= 0]
+
+
+def bounds_path(model_path):
+    """Clamp bounds are stored next to the model, e.g. my_new_model.bounds.json."""
+    return os.path.splitext(str(model_path))[0] + '.bounds.json'
+
+
+class FeatureBounds:
+    """Training min/max per feature, plus counters of how often clamping fires."""
+
+    def __init__(self, lows, highs, features=FEATURES):
+        self.features = list(features)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self._lock = threading.Lock()
+        self.reset_counters()
+
+    @classmethod
+    def from_frame(cls, frame, features=FEATURES):
+        return cls(
+            frame[features].min().to_numpy(dtype=np.float64),
+            frame[features].max().to_numpy(dtype=np.float64),
+            features,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['lows'], data['highs'], data.get('features', FEATURES))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {
+            'features': self.features,
+            'lows': self.lows.tolist(),
+            'highs': self.highs.tolist(),
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def reset_counters(self):
+        with self._lock:
+            self.checked = 0
+            self.below = np.zeros(len(self.features), dtype=np.int64)
+            self.above = np.zeros(len(self.features), dtype=np.int64)
+
+    def clip(self, values):
+        """Clamp a single input vector or an (n, features) matrix in one pass."""
+        values = np.asarray(values, dtype=np.float64)
+        rows = values.reshape(-1, len(self.features))
+        below = (rows < self.lows).sum(axis=0)
+        above = (rows > self.highs).sum(axis=0)
+        with self._lock:
+            self.checked += len(rows)
+            self.below += below
+            self.above += above
+        return np.clip(values, self.lows, self.highs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'checked': self.checked,
+                'features': {
+                    col: {
+                        'min': float(self.lows[i]),
+                        'max': float(self.highs[i]),
+                        'below': int(self.below[i]),
+                        'above': int(self.above[i]),
+                    }
+                    for i, col in enumerate(self.features)
+                },
+            }
@@ -0,0 +1,80 @@
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+_corr_cache = {}
+_render_lock = threading.Lock()
+
+
+def correlation_matrix(df, version):
+    """Correlation of the numeric columns, computed once per dataset version."""
+    corr = _corr_cache.get(version)
+    if corr is None:
+        corr = df.corr(numeric_only=True)
+        _corr_cache.clear()
+        _corr_cache[version] = corr
+    return corr
+
+
+def correlation_payload(df, version):
+    corr = correlation_matrix(df, version)
+    return {
+        'version': version,
+        'columns': list(corr.columns),
+        'matrix': [[round(float(v), 4) for v in row] for row in corr.to_numpy()],
+    }
+
+
+def default_cache_dir():
+    """HEATMAP_CACHE_DIR, shared by settings.py and train_model.py (which runs without Django settings)."""
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.getenv('HEATMAP_CACHE_DIR', os.path.join(project_dir, '.heatmap_cache'))
+
+
+def heatmap_filename(version):
+    return f"heatmap-{version}.png"
+
+
+def render_heatmap(df, version, cache_dir):
+    """Return the path of the heatmap PNG for ``version``, rendering it on first use.
+
+    Files are content-addressed by dataset version and published with an atomic
+    rename, so concurrent workers never read a half-written image.
+    """
+    path = os.path.join(cache_dir, heatmap_filename(version))
+    if os.path.exists(path):
+        return path
+
+    with _render_lock:
+        if os.path.exists(path):
+            return path
+
+        # Plotting stack is only needed on a cache miss
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        os.makedirs(cache_dir, exist_ok=True)
+        corr = correlation_matrix(df, version)
+        fig = plt.figure(figsize=(10, 8))
+        try:
+            sns.heatmap(corr, annot=True, cmap='coolwarm', fmt='.2f')
+            plt.title('Feature Correlation Heatmap')
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.png')
+            os.close(fd)
+            try:
+                fig.savefig(tmp_path, format='png')
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        finally:
+            plt.close(fig)
+
+        logger.info(f"Rendered correlation heatmap for dataset {version}")
+    return path
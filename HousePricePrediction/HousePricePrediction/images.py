@@ -0,0 +1,158 @@
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.urls import reverse
+
+from .models import HouseListing, ImageRenderJob
+
+logger = logging.getLogger(__name__)
+
+# Widths served in srcset; images narrower than a width are never upscaled
+WIDTHS = (320, 640, 1280)
+
+# URL extension -> (Pillow format, content type, save options)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Striped by listing id: a fixed number of locks however many listings exist
+LOCK_STRIPES = 64
+_render_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def image_version(listing):
+    """Short digest of the stored file name; a new upload gets new derivative URLs."""
+    if not listing.image:
+        return None
+    return hashlib.sha1(listing.image.name.encode()).hexdigest()[:12]
+
+
+def derivative_filename(listing, width, fmt):
+    return f"{listing.id}-{image_version(listing)}-{width}.{fmt}"
+
+
+def _listing_lock(listing_id):
+    # Renders for different listings mostly land on different stripes and run side by side
+    return _render_locks[listing_id % LOCK_STRIPES]
+
+
+def derivative_url(listing, width, fmt='jpg'):
+    return reverse('listing_image', args=[listing.id, image_version(listing), width, fmt])
+
+
+def srcset(listing, fmt='jpg'):
+    if not listing.image:
+        return ''
+    return ', '.join(f"{derivative_url(listing, width, fmt)} {width}w" for width in WIDTHS)
+
+
+def render_derivative(listing, width, fmt, cache_dir=None):
+    """Return the path of a resized copy of the listing image, rendering it on first use.
+
+    EXIF orientation is applied to the pixels and then all metadata (EXIF, GPS,
+    ICC, comments) is dropped. Files are published with an atomic rename.
+    """
+    cache_dir = cache_dir or settings.IMAGE_CACHE_DIR
+    path = os.path.join(cache_dir, derivative_filename(listing, width, fmt))
+    if os.path.exists(path):
+        return path
+
+    with _listing_lock(listing.id):
+        if os.path.exists(path):
+            return path
+
+        from PIL import Image, ImageOps
+
+        pil_format, _, options = FORMATS[fmt]
+        os.makedirs(cache_dir, exist_ok=True)
+        with listing.image.open('rb') as source, Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha and pil_format == 'WEBP' else 'RGB')
+            if image.width > width:
+                image.thumbnail((width, image.height), Image.LANCZOS)
+
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=f'.{fmt}')
+            os.close(fd)
+            try:
+                # No exif/icc_profile arguments: the copy carries no metadata
+                image.save(tmp_path, format=pil_format, **options)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        logger.info(f"Rendered {width}px {fmt} image for listing {listing.id}")
+    return path
+
+
+def render_all(listing):
+    for fmt in FORMATS:
+        for width in WIDTHS:
+            render_derivative(listing, width, fmt)
+
+
+def is_rendered(listing, cache_dir=None):
+    cache_dir = cache_dir or settings.IMAGE_CACHE_DIR
+    return all(
+        os.path.exists(os.path.join(cache_dir, derivative_filename(listing, width, fmt)))
+        for fmt in FORMATS for width in WIDTHS
+    )
+
+
+def prune_derivatives(listing_id, keep_version=None, cache_dir=None):
+    """Delete a listing's derivatives of earlier uploads (all of them when ``keep_version`` is None)."""
+    cache_dir = cache_dir or settings.IMAGE_CACHE_DIR
+    removed = 0
+    for path in glob.glob(os.path.join(cache_dir, f"{listing_id}-*")):
+        if keep_version is not None and os.path.basename(path).startswith(f"{listing_id}-{keep_version}-"):
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def render_pending(limit=50):
+    """Render the queued listings' derivatives and prune superseded ones. Returns the number of jobs done."""
+    jobs = list(ImageRenderJob.objects.all()[:limit])
+    listings = HouseListing.objects.in_bulk([job.listing_id for job in jobs])
+    for job in jobs:
+        listing = listings.get(job.listing_id)
+        try:
+            if listing is not None and listing.image:
+                render_all(listing)
+                prune_derivatives(listing.id, keep_version=image_version(listing))
+            else:
+                prune_derivatives(job.listing_id)
+        except Exception as e:
+            # The image view still renders anything missing on first request
+            logger.error(f"Error rendering images for listing {job.listing_id}: {str(e)}")
+        # A save since the job was read queued it again; leave that one for the next pass
+        ImageRenderJob.objects.filter(listing_id=job.listing_id, queued_at=job.queued_at).delete()
+    return len(jobs)
+
+
+@receiver(post_save, sender=HouseListing)
+def _listing_saved(sender, instance, **kwargs):
+    # Rendering is left to `manage.py render_images`; the save itself only queues a job
+    if instance.image and not is_rendered(instance):
+        ImageRenderJob.objects.update_or_create(listing_id=instance.id)
+
+
+@receiver(post_delete, sender=HouseListing)
+def _listing_deleted(sender, instance, **kwargs):
+    listing_id = instance.id
+    transaction.on_commit(lambda: prune_derivatives(listing_id))
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .features import FEATURES
+from .model_bundle import load_bundle, save_bundle
+from .models import HouseListing, ListingTrainingRow, IncrementalModelState
+from .streaming import LeastSquaresStats, build_estimator, stats_path
+
+logger = logging.getLogger(__name__)
+
+# Model feature -> HouseListing field. Listings have no land area or floor;
+# those are filled with the training mean so they add no spurious signal.
+LISTING_FIELDS = {
+    'Avg. Area Income': 'median_income',
+    'Avg. Area House Age': 'house_age',
+    'Avg. Area Number of Rooms': 'rooms',
+    'Avg. Area Number of Bedrooms': 'bedrooms',
+    'Area Population': 'population',
+    'Build-up Area': 'area',
+}
+
+# Re-read listings saved this long before the watermark, in case a save
+# committed after a later one was already processed
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class IncrementalUpdateError(Exception):
+    pass
+
+
+def listing_row(listing, fill):
+    """(features, price) for a listing, cleaned like the training data, or None if unusable."""
+    if listing.price is None or listing.price <= 0:
+        return None
+    values = []
+    for i, col in enumerate(FEATURES):
+        field = LISTING_FIELDS.get(col)
+        if field is None:
+            values.append(float(fill[i]))
+            continue
+        value = getattr(listing, field)
+        if value is None or value < 0:
+            return None
+        values.append(float(round(value)))
+    return values, float(round(listing.price))
+
+
+def _stats_for(rows):
+    return LeastSquaresStats.from_rows([f for f, _ in rows], [p for _, p in rows]) if rows else LeastSquaresStats()
+
+
+def _published_version(bundle_path, force):
+    """Version of the bundle being served ('' if none), checking it is one we may replace."""
+    from sklearn.linear_model import LinearRegression
+
+    if not os.path.exists(bundle_path):
+        return ''
+    bundle = load_bundle(bundle_path)
+    estimator = bundle.estimator
+    if not (isinstance(estimator, LinearRegression) and estimator.positive):
+        if not force:
+            raise IncrementalUpdateError(
+                f"The published model is {type(estimator).__name__}; incremental updates would replace it "
+                "with a linear model (retrain with `train_model.py --incremental`, or use --force)"
+            )
+        logger.warning(
+            f"Replacing the published {type(estimator).__name__} model {bundle.version} "
+            f"({bundle.metrics.get('model', 'unknown')}) with a positive linear model"
+        )
+    return bundle.version
+
+
+def update_model(bundle_path=None, force=False, rebuild=False):
+    """Fold listings saved or deleted since the last run into the published model.
+
+    Base statistics come from the last train_model.py run; listing statistics
+    are kept in the database and only changed listings are added/subtracted.
+    Deleted listings are found through the rows flagged by the delete signal.
+    If the published bundle is not the one this command last wrote (e.g.
+    train_model.py ran since), every listing row is re-derived and folded
+    into the new base. The new bundle is published atomically inside the same
+    transaction as the bookkeeping, so a failure leaves both untouched.
+
+    Returns (rows added, rows removed, new bundle version or None).
+    """
+    bundle_path = bundle_path or settings.MODEL_BUNDLE_PATH
+    try:
+        base = LeastSquaresStats.load(stats_path(bundle_path))
+    except OSError:
+        raise IncrementalUpdateError(f"No training statistics at {stats_path(bundle_path)}; run train_model.py first")
+    published = _published_version(bundle_path, force)
+
+    with transaction.atomic():
+        state, _ = IncrementalModelState.objects.select_for_update().get_or_create(pk=1)
+        listing_stats = LeastSquaresStats.from_dict(state.stats) if state.stats else LeastSquaresStats()
+        # Rows are filled with the base means, so a new base means re-deriving all of them
+        rebase = not state.bundle_version or state.bundle_version != published
+        rebuild = rebuild or rebase
+
+        changed = HouseListing.objects.only('id', 'price', 'updated_at', *LISTING_FIELDS.values())
+        if state.watermark is not None and not rebuild:
+            changed = changed.filter(updated_at__gte=state.watermark - WATERMARK_OVERLAP)
+        changed = list(changed)
+        existing = ListingTrainingRow.objects.in_bulk([listing.id for listing in changed])
+
+        added, removed, upserts, dropped = [], [], [], []
+        for listing in changed:
+            old = existing.get(listing.id)
+            if old is not None and old.listing_updated_at == listing.updated_at and not rebase:
+                continue
+            row = listing_row(listing, base.mean_x)
+            if old is not None:
+                removed.append((old.features, old.price))
+            if row is not None:
+                added.append(row)
+                upserts.append(ListingTrainingRow(
+                    listing_id=listing.id, features=row[0], price=row[1], listing_updated_at=listing.updated_at
+                ))
+            elif old is not None:
+                dropped.append(listing.id)
+
+        if rebuild:
+            # Also catches listings deleted with raw SQL, which sends no signal
+            gone = ListingTrainingRow.objects.exclude(listing_id__in=HouseListing.objects.values('id'))
+        else:
+            gone = ListingTrainingRow.objects.filter(deleted=True)
+        for row in gone:
+            removed.append((row.features, row.price))
+            dropped.append(row.listing_id)
+
+        if changed:
+            state.watermark = max(listing.updated_at for listing in changed)
+        if not added and not removed and not rebuild:
+            state.save(update_fields=['watermark', 'updated_at'])
+            return 0, 0, None
+
+        if upserts:
+            ListingTrainingRow.objects.bulk_create(
+                upserts, update_conflicts=True, unique_fields=['listing_id'],
+                update_fields=['features', 'price', 'listing_updated_at', 'deleted'],
+            )
+        if dropped:
+            ListingTrainingRow.objects.filter(listing_id__in=dropped).delete()
+
+        if rebuild:
+            # Recompute from the stored rows to shed any floating-point drift
+            listing_stats = _stats_for(list(ListingTrainingRow.objects.values_list('features', 'price')))
+        else:
+            listing_stats.subtract(_stats_for(removed)).merge(_stats_for(added))
+
+        combined = base.copy().merge(listing_stats)
+        coef, intercept = combined.solve(positive=True)
+        rss = combined.residual_sum_of_squares(coef)
+        data_hash = hashlib.sha256(json.dumps(combined.to_dict(), sort_keys=True).encode()).hexdigest()
+        estimator = build_estimator(coef, intercept)
+        version = save_bundle(
+            bundle_path, estimator, combined.bounds(),
+            metrics={
+                'r2': 1 - rss / combined.yty if combined.yty else 0.0,
+                'mse': rss / combined.n,
+                'rmse': (rss / combined.n) ** 0.5,
+                'model': 'linear_positive',
+                'listing_rows': listing_stats.n,
+            },
+            data_hash=data_hash,
+        )
+
+        state.stats = listing_stats.to_dict()
+        state.bundle_version = version
+        state.save()
+
+    logger.info(f"Model {version}: +{len(added)} / -{len(removed)} listing row(s), {listing_stats.n} in total")
+    return len(added), len(removed), version
@@ -0,0 +1,301 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+
+from django.conf import settings
+
+# NumPy, pandas, scikit-learn and joblib are imported on first use only, so
+# worker processes that never serve a prediction don't pay for them.
+
+logger = logging.getLogger(__name__)
+
+# Same rule for the single prediction form and the bulk API
+MIN_INCOME = 75000
+
+_lock = threading.RLock()
+_dataset = None
+_neighbor_index = None
+_model_store = None
+_client = None
+_batcher = None
+_cache_counts = {'hits': 0, 'misses': 0, 'errors': 0}
+
+
+class InferenceUnavailable(Exception):
+    pass
+
+
+def get_dataset():
+    """Return (housing_data, dataset_version), loading the cache on first use."""
+    global _dataset
+    if _dataset is None:
+        with _lock:
+            if _dataset is None:
+                from .dataset import load_dataset
+                try:
+                    _dataset = load_dataset(settings.DATASET_PATH, settings.DATASET_CACHE_DIR)
+                except Exception as e:
+                    logger.error(f"Error loading dataset: {str(e)}")
+                    return None, None
+    return _dataset
+
+
+def get_neighbor_index():
+    global _neighbor_index
+    if _neighbor_index is None:
+        housing_data, _ = get_dataset()
+        if housing_data is None:
+            return None
+        with _lock:
+            if _neighbor_index is None:
+                from .neighbors import NeighborIndex
+                try:
+                    _neighbor_index = NeighborIndex(housing_data)
+                except Exception as e:
+                    logger.error(f"Error building neighbour index: {str(e)}")
+                    return None
+    return _neighbor_index
+
+
+def _fallback_bounds():
+    from .features import FeatureBounds
+    housing_data, _ = get_dataset()
+    return FeatureBounds.from_frame(housing_data)
+
+
+def get_model_store():
+    global _model_store
+    if _model_store is None:
+        with _lock:
+            if _model_store is None:
+                from .model_bundle import ModelStore
+                # Falls back to the bare pickle and the dataset range if no bundle has been built yet
+                _model_store = ModelStore(
+                    settings.MODEL_BUNDLE_PATH,
+                    legacy_model_path=os.path.join(settings.BASE_DIR, 'my_new_model.pkl'),
+                    fallback_bounds=_fallback_bounds,
+                    check_interval=settings.MODEL_RELOAD_INTERVAL,
+                )
+    return _model_store
+
+
+def get_model_bundle():
+    try:
+        return get_model_store().get()
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
+        return None
+
+
+def _predict_rows(rows):
+    bundle = get_model_bundle()
+    if bundle is None:
+        raise InferenceUnavailable("Prediction system not available")
+    return bundle.predict(rows).tolist()
+
+
+def get_batcher():
+    """Micro-batcher that merges concurrent /result/ predictions into one predict call."""
+    global _batcher
+    if _batcher is None:
+        with _lock:
+            if _batcher is None:
+                from .batching import PredictionBatcher
+                _batcher = PredictionBatcher(
+                    _predict_rows,
+                    max_wait_ms=settings.PREDICTION_BATCH_WINDOW_MS,
+                    max_rows=settings.PREDICTION_BATCH_MAX_ROWS,
+                )
+    return _batcher
+
+
+def warm_up():
+    """Load the dataset, index and model up front, e.g. before forking workers."""
+    get_neighbor_index()
+    get_model_bundle()
+
+
+def _plain(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def get_client():
+    """Per-process pooled client for the out-of-process inference server."""
+    global _client
+    if _client is None or _client.pid != os.getpid():
+        with _lock:
+            if _client is None or _client.pid != os.getpid():
+                from .inference_server import InferenceClient
+                _client = InferenceClient(
+                    settings.INFERENCE_SOCKET,
+                    pool_size=settings.INFERENCE_POOL_SIZE,
+                    timeout=settings.INFERENCE_TIMEOUT,
+                )
+                _client.pid = os.getpid()
+    return _client
+
+
+def _remote():
+    return settings.INFERENCE_BACKEND == 'remote'
+
+
+def predict_one(inputs):
+    if _remote():
+        return get_client().call('predict_one', inputs=list(inputs))
+    return local_predict_one(inputs)
+
+
+def predict_many(matrix):
+    if _remote():
+        import numpy as np
+        result = get_client().call('predict_many', matrix=matrix.tolist())
+        return (
+            np.array(result['clamped'], dtype=np.float64).reshape(matrix.shape),
+            np.array(result['valid'], dtype=bool),
+            np.array(result['predictions'], dtype=np.float64),
+        )
+    return local_predict_many(matrix)
+
+
+def linear_export():
+    if _remote():
+        return get_client().call('linear_export')
+    return local_linear_export()
+
+
+def stats():
+    if _remote():
+        return get_client().call('stats')
+    return local_stats()
+
+
+def _count(name):
+    with _lock:
+        _cache_counts[name] += 1
+
+
+def _cache_key(bundle, inputs):
+    _, dataset_version = get_dataset()
+    raw = f"{bundle.version}|{dataset_version}|{','.join(repr(v) for v in inputs)}"
+    return 'predict:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _cache_get(key):
+    from django.core.cache import caches
+    try:
+        return caches['predictions'].get(key)
+    except Exception as e:
+        _count('errors')
+        logger.warning(f"Prediction cache read failed: {str(e)}")
+        return None
+
+
+def _cache_set(key, value):
+    from django.core.cache import caches
+    try:
+        caches['predictions'].set(key, value)
+    except Exception as e:
+        _count('errors')
+        logger.warning(f"Prediction cache write failed: {str(e)}")
+
+
+def local_predict_one(inputs, use_cache=True):
+    """Clamp and predict one validated input vector and find comparable properties.
+
+    Returns plain Python values so the result can also cross a process boundary.
+    """
+    bundle = get_model_bundle()
+    neighbor_index = get_neighbor_index()
+    if bundle is None or neighbor_index is None:
+        raise InferenceUnavailable("Prediction system not available")
+
+    # Clamp inputs to training min/max
+    inputs = bundle.bounds.clip(inputs).tolist()
+    inputs[7] = int(round(inputs[7]))
+
+    # Keyed on model and dataset version, so a new bundle or dataset never sees stale entries
+    key = None
+    if use_cache:
+        key = _cache_key(bundle, inputs)
+        cached = _cache_get(key)
+        if cached is not None:
+            _count('hits')
+            return cached
+        _count('misses')
+
+    if settings.PREDICTION_BATCH_WINDOW_MS > 0:
+        raw_pred = get_batcher().predict(inputs)
+    else:
+        raw_pred = bundle.predict_one(inputs)
+    prediction = max(0, round(float(raw_pred), 2))  # Clamp to zero
+
+    closest_row = neighbor_index.nearest(inputs)
+    similar_rows = neighbor_index.similar(inputs, prediction * 0.9, prediction * 1.1, k=5)
+
+    similar = []
+    for _, row in similar_rows.iterrows():
+        similar.append({
+            'price': _plain(row['Price']),
+            'address': row['Address'],
+            'bedrooms': _plain(row['Avg. Area Number of Bedrooms']),
+            'rooms': _plain(row['Avg. Area Number of Rooms']),
+            'population': _plain(row['Area Population']),
+            'buildup_area': _plain(row['Build-up Area']),
+            'land_area': _plain(row['Land Area']),
+        })
+
+    output = {
+        'prediction': prediction,
+        'inputs': inputs,
+        'address': closest_row['Address'],
+        'similar': similar,
+        'metrics': bundle.metrics,
+        'model_version': bundle.version,
+    }
+    if key is not None:
+        _cache_set(key, output)
+    return output
+
+
+def local_predict_many(matrix):
+    """Vectorized clamp + predict for the bulk API; see bulk.predict_batch."""
+    from .bulk import predict_batch
+
+    bundle = get_model_bundle()
+    if bundle is None:
+        raise InferenceUnavailable("Prediction system not available")
+    return predict_batch(bundle, matrix, bundle.bounds)
+
+
+def local_linear_export():
+    """Coefficients and clamp bounds for estimating in the browser, or None for a non-linear model.
+
+    Mirrors local_predict_one: clamp to bounds, round the floor, dot product,
+    clamp the result to zero.
+    """
+    bundle = get_model_bundle()
+    if bundle is None:
+        raise InferenceUnavailable("Prediction system not available")
+    if bundle.linear is None:
+        return None
+    return {
+        **bundle.linear.to_dict(),
+        'model_version': bundle.version,
+        # None for an unbounded feature (inf is not valid JSON)
+        'lows': [v if math.isfinite(v) else None for v in bundle.bounds.lows.tolist()],
+        'highs': [v if math.isfinite(v) else None for v in bundle.bounds.highs.tolist()],
+        'min_income': MIN_INCOME,
+        'integer_features': [len(bundle.features) - 1],
+    }
+
+
+def local_stats():
+    bundle = get_model_bundle()
+    return {
+        'model_version': bundle.version if bundle is not None else None,
+        'clamping': bundle.bounds.stats() if bundle is not None else None,
+        'batching': _batcher.stats() if _batcher is not None else None,
+        'cache': dict(_cache_counts),
+    }
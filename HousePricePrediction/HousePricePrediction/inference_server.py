@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .inference import InferenceUnavailable
+
+logger = logging.getLogger(__name__)
+
+# Frames are a 4-byte big-endian length followed by a UTF-8 JSON document
+HEADER = struct.Struct('>I')
+MAX_FRAME = 64 * 1024 * 1024
+
+
+def encode_frame(payload):
+    body = json.dumps(payload).encode('utf-8')
+    return HEADER.pack(len(body)) + body
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            raise ConnectionError("Inference server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_frame(sock):
+    (size,) = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if size > MAX_FRAME:
+        raise ValueError(f"Frame of {size} bytes exceeds limit")
+    return json.loads(_recv_exact(sock, size))
+
+
+# Server
+
+def _handle(request):
+    from . import inference
+
+    op = request.get('op')
+    args = request.get('args', {})
+    if op == 'predict_one':
+        return inference.local_predict_one(args['inputs'])
+    if op == 'predict_many':
+        from .bulk import as_matrix
+        matrix = as_matrix(args['matrix'])
+        clamped, valid, predictions = inference.local_predict_many(matrix)
+        return {
+            'clamped': clamped.tolist(),
+            'valid': valid.tolist(),
+            'predictions': predictions.tolist(),
+        }
+    if op == 'linear_export':
+        return inference.local_linear_export()
+    if op == 'stats':
+        return inference.local_stats()
+    if op == 'ping':
+        return 'pong'
+    raise ValueError(f"Unknown operation: {op}")
+
+
+def _dispatch(request):
+    try:
+        return {'id': request.get('id'), 'result': _handle(request)}
+    except InferenceUnavailable as e:
+        return {'id': request.get('id'), 'error': str(e), 'unavailable': True}
+    except Exception as e:
+        logger.error(f"Inference request failed: {str(e)}")
+        return {'id': request.get('id'), 'error': str(e)}
+
+
+class InferenceServer:
+    """Owns the model, dataset and neighbour index and serves them over a Unix socket."""
+
+    def __init__(self, path, threads=16):
+        self.path = str(path)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='inference')
+
+    async def _serve_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                except asyncio.IncompleteReadError as e:
+                    if e.partial:
+                        logger.warning("Dropping inference client: connection closed mid-frame")
+                    break
+                (size,) = HEADER.unpack(header)
+                if size > MAX_FRAME:
+                    break
+                request = json.loads(await reader.readexactly(size))
+                response = await loop.run_in_executor(self.executor, _dispatch, request)
+                writer.write(encode_frame(response))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            logger.warning("Dropping inference client: connection closed mid-frame")
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Dropping inference client: {str(e)}")
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        server = await asyncio.start_unix_server(self._serve_client, path=self.path)
+        os.chmod(self.path, 0o660)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        logger.info(f"Inference server listening on {self.path}")
+        async with server:
+            await stop.wait()
+        self.executor.shutdown(wait=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def run(self):
+        from . import inference
+        inference.warm_up()
+        asyncio.run(self.serve())
+
+
+# Client
+
+class InferenceClient:
+    """Blocking client with a small pool of persistent connections, for sync Django views."""
+
+    def __init__(self, path, pool_size=4, timeout=2.0):
+        self.path = str(path)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._open = 0
+        self._lock = threading.Lock()
+        self._ids = 0
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _open_connection(self):
+        # The caller has already counted it in self._open
+        try:
+            return self._connect()
+        except OSError as e:
+            with self._lock:
+                self._open -= 1
+            raise InferenceUnavailable(f"Cannot reach inference server: {str(e)}")
+
+    def _acquire(self):
+        """(socket, True if it came from the idle pool)."""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._open < self.pool_size
+            if can_open:
+                self._open += 1
+        if can_open:
+            return self._open_connection(), False
+        try:
+            return self._idle.get(timeout=self.timeout), True
+        except queue.Empty:
+            raise InferenceUnavailable("Timed out waiting for an inference connection")
+
+    def _discard(self, sock):
+        sock.close()
+        with self._lock:
+            self._open -= 1
+
+    def _roundtrip(self, sock, frame):
+        try:
+            sock.sendall(frame)
+            return recv_frame(sock)
+        except (OSError, ValueError):
+            # Timeouts land here too; the connection state is unknown, so drop it
+            self._discard(sock)
+            raise
+
+    def call(self, op, **args):
+        sock, pooled = self._acquire()
+        with self._lock:
+            self._ids += 1
+            request_id = self._ids
+        frame = encode_frame({'id': request_id, 'op': op, 'args': args})
+        try:
+            try:
+                response = self._roundtrip(sock, frame)
+            except ConnectionError:
+                # Broken pipe, reset or EOF: an idle pooled connection may have been
+                # closed by a restarted server. Every op is read-only, so retry once.
+                if not pooled:
+                    raise
+                # Takes over the slot of the discarded connection
+                with self._lock:
+                    self._open += 1
+                sock = self._open_connection()
+                response = self._roundtrip(sock, frame)
+        except (OSError, ValueError) as e:
+            raise InferenceUnavailable(f"Inference call failed: {str(e)}")
+        self._idle.put(sock)
+
+        if 'error' in response:
+            if response.get('unavailable'):
+                raise InferenceUnavailable(response['error'])
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
@@ -0,0 +1,88 @@
+import math
+
+EXPORT_FORMAT = 1
+
+
+class LinearPredictor:
+    """y = coef · x + intercept, with no sklearn input validation in the way.
+
+    ``predict_one`` is plain Python (no imports at all); ``predict_many`` is
+    a single NumPy matrix-vector product.
+    """
+
+    def __init__(self, coef, intercept, features):
+        self.coef = [float(c) for c in coef]
+        self.intercept = float(intercept)
+        self.features = list(features)
+        self._coef_array = None
+
+    def predict_one(self, values):
+        total = self.intercept
+        for c, v in zip(self.coef, values):
+            total += c * v
+        return total
+
+    def predict_many(self, matrix):
+        import numpy as np
+        if self._coef_array is None:
+            self._coef_array = np.asarray(self.coef, dtype=np.float64)
+        return np.asarray(matrix, dtype=np.float64) @ self._coef_array + self.intercept
+
+    def to_dict(self):
+        return {
+            'format': EXPORT_FORMAT,
+            'features': self.features,
+            'coef': self.coef,
+            'intercept': self.intercept,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('format') != EXPORT_FORMAT:
+            raise ValueError("Unknown linear export format")
+        return cls(data['coef'], data['intercept'], data['features'])
+
+
+def _linear_parts(estimator):
+    coef = getattr(estimator, 'coef_', None)
+    intercept = getattr(estimator, 'intercept_', None)
+    if coef is None or intercept is None:
+        return None
+    coef = [float(c) for c in getattr(coef, 'ravel', lambda: coef)()]
+    intercept = getattr(intercept, 'ravel', lambda: [intercept])()
+    if len(intercept) != 1:
+        # Multi-output model
+        return None
+    return coef, float(intercept[0])
+
+
+def compile_linear(estimator, features):
+    """Reduce a fitted linear estimator to a LinearPredictor, or None if it is not linear.
+
+    Handles bare linear models (LinearRegression, Ridge, Lasso and their CV
+    variants) and StandardScaler → linear-model pipelines, whose scaling is
+    folded into the coefficients. Any other pipeline step returns None.
+    """
+    steps = [step for _, step in getattr(estimator, 'steps', [(None, estimator)])]
+    parts = _linear_parts(steps[-1])
+    if parts is None:
+        return None
+    coef, intercept = parts
+
+    for step in reversed(steps[:-1]):
+        from sklearn.preprocessing import StandardScaler
+        # Anything else (MinMaxScaler, feature selection, ...) is served by the estimator itself
+        if not isinstance(step, StandardScaler):
+            return None
+        # with_mean=False still records mean_, but the step does not subtract it
+        mean = step.mean_ if step.with_mean and step.mean_ is not None else None
+        scale = step.scale_ if step.with_std and step.scale_ is not None else None
+        mean = [0.0] * len(coef) if mean is None else [float(m) for m in mean]
+        scale = [1.0] * len(coef) if scale is None else [float(s) for s in scale]
+        # w·((x - m) / s) + b  ==  (w / s)·x + (b - Σ w m / s)
+        coef = [w / s for w, s in zip(coef, scale)]
+        intercept -= sum(w * m for w, m in zip(coef, mean))
+
+    if len(coef) != len(features) or not all(math.isfinite(c) for c in coef + [intercept]):
+        return None
+    return LinearPredictor(coef, intercept, features)
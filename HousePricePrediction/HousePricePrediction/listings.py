@@ -0,0 +1,348 @@
+import base64
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Count, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.urls import reverse
+
+from .models import HouseListing, ListingTrainingRow
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 24
+
+# SQLite FTS5 index over listing text, created by migration 0016; rowid is the listing id
+FTS_TABLE = 'houselisting_fts'
+# bm25 column weights: a hit in the title counts most, then location, then description
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+Page = namedtuple('Page', ['items', 'next_cursor'])
+
+_fts_ready = None
+
+
+def fts_enabled():
+    global _fts_ready
+    if _fts_ready is None:
+        _fts_ready = False
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _fts_ready = cursor.fetchone() is not None
+    return _fts_ready
+
+
+# Search index maintenance
+
+def _text(listing):
+    return [listing.title or '', listing.location or '', listing.description or '']
+
+
+def index_listing(listing):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, location, description) VALUES (%s, %s, %s, %s)",
+            [listing.id] + _text(listing),
+        )
+
+
+def remove_listing(listing_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [listing_id])
+
+
+def rebuild_index():
+    """Re-index every listing, e.g. after queryset.update() calls that skip signals."""
+    table = HouseListing._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) "
+            f"SELECT id, title, COALESCE(location, ''), COALESCE(description, '') FROM \"{table}\""
+        )
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+@receiver(post_save, sender=HouseListing)
+def _listing_saved(sender, instance, **kwargs):
+    if fts_enabled():
+        index_listing(instance)
+    invalidate_facets()
+
+
+@receiver(post_delete, sender=HouseListing)
+def _listing_deleted(sender, instance, **kwargs):
+    if fts_enabled():
+        remove_listing(instance.id)
+    invalidate_facets()
+    # Queue the row for `manage.py update_model` to subtract, without it scanning every listing
+    ListingTrainingRow.objects.filter(listing_id=instance.id).update(deleted=True)
+
+
+# Cursors are opaque to clients: base64 of the sort key of the last row shown
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        # A mangled cursor just starts again from the first page
+        return None
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class ListingFilterError(ValueError):
+    pass
+
+
+# ?min_<name>=&max_<name>= range filters: name -> (model field, type)
+RANGE_FILTERS = {
+    'price': ('price', float),
+    'area': ('area', float),
+    'bedrooms': ('bedrooms', int),
+    'age': ('house_age', int),
+}
+
+# sort name -> (model field, descending); keyset pagination runs on (field, id)
+SORTS = {
+    'newest': ('created_at', True),
+    'price_asc': ('price', False),
+    'price_desc': ('price', True),
+}
+
+SORT_LABELS = {
+    'relevance': 'Best match',
+    'newest': 'Newest',
+    'price_asc': 'Price: low to high',
+    'price_desc': 'Price: high to low',
+}
+
+FACET_FIELDS = ('location', 'bedrooms')
+FACET_LIMIT = 30
+
+
+def parse_filters(params):
+    """Validated filters from request GET params (a QueryDict)."""
+    filters = {}
+    for name, (_, cast) in RANGE_FILTERS.items():
+        for bound in ('min', 'max'):
+            key = f'{bound}_{name}'
+            raw = params.get(key, '').strip()
+            if not raw:
+                continue
+            try:
+                value = cast(raw)
+            except ValueError:
+                raise ListingFilterError(f"{key} must be a number")
+            if not math.isfinite(value) or value < 0:
+                raise ListingFilterError(f"{key} must be zero or more")
+            filters[key] = value
+
+    locations = sorted({value.strip() for value in params.getlist('location') if value.strip()})
+    if locations:
+        filters['location'] = locations
+    try:
+        bedrooms = sorted({int(value) for value in params.getlist('bedrooms') if value.strip()})
+    except ValueError:
+        raise ListingFilterError("bedrooms must be a whole number")
+    if bedrooms:
+        filters['bedrooms'] = bedrooms
+
+    sort = params.get('sort', '').strip()
+    if sort and sort != 'relevance' and sort not in SORTS:
+        raise ListingFilterError(f"sort must be one of: relevance, {', '.join(SORTS)}")
+    if sort:
+        filters['sort'] = sort
+    return filters
+
+
+def apply_filters(queryset, filters, skip=None):
+    """Narrow ``queryset`` by parsed filters, leaving out the ``skip`` facet."""
+    for name, (field, _) in RANGE_FILTERS.items():
+        if field == skip:
+            continue
+        if f'min_{name}' in filters:
+            queryset = queryset.filter(**{f'{field}__gte': filters[f'min_{name}']})
+        if f'max_{name}' in filters:
+            queryset = queryset.filter(**{f'{field}__lte': filters[f'max_{name}']})
+    if 'location' in filters and skip != 'location':
+        queryset = queryset.filter(location__in=filters['location'])
+    if 'bedrooms' in filters and skip != 'bedrooms':
+        queryset = queryset.filter(bedrooms__in=filters['bedrooms'])
+    return queryset
+
+
+def text_filter(queryset, query):
+    """Restrict to listings matching free text, through FTS5 when available."""
+    query = query.strip()
+    if not query:
+        return queryset
+    match = match_expression(query)
+    if match and fts_enabled():
+        return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(location__icontains=query) |
+        Q(description__icontains=query)
+    )
+
+
+# Facet counts are cached per filter combination. Every listing save bumps the
+# generation stored in the cache, which orphans all earlier entries at once.
+
+FACET_GENERATION_KEY = 'listings:facets:generation'
+
+
+def _facet_generation(cache):
+    generation = cache.get(FACET_GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(FACET_GENERATION_KEY, generation, timeout=None)
+    return generation
+
+
+def invalidate_facets():
+    caches['listings'].set(FACET_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def facet_counts(queryset, filters, query=''):
+    """Listing counts per location and bedroom count.
+
+    Each facet honours every filter except its own, so picking one location
+    still shows how many listings the other locations would give.
+    """
+    cache = caches['listings']
+    narrowing = {name: value for name, value in filters.items() if name != 'sort'}
+    fingerprint = json.dumps({'q': query.strip(), **narrowing}, sort_keys=True)
+    key = f"listings:facets:{_facet_generation(cache)}:{hashlib.sha1(fingerprint.encode()).hexdigest()}"
+    facets = cache.get(key)
+    if facets is not None:
+        return facets
+
+    base = text_filter(queryset, query)
+    facets = {}
+    for field in FACET_FIELDS:
+        rows = (
+            apply_filters(base, filters, skip=field)
+            .filter(**{f'{field}__isnull': False})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('id'))
+            .order_by('-count', field)[:FACET_LIMIT]
+        )
+        facets[field] = [{'value': row[field], 'count': row['count']} for row in rows]
+    cache.set(key, facets)
+    return facets
+
+
+def _keyset(queryset, field, descending, cursor, per_page):
+    # Keyset pagination on (field, id); each sort field has an (on_sale, field) index
+    key = decode_cursor(cursor)
+    if isinstance(key, list) and len(key) == 2:
+        try:
+            value = datetime.fromisoformat(key[0]) if field == 'created_at' else float(key[0])
+            op = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': int(key[1])})
+            )
+        except (TypeError, ValueError):
+            pass
+
+    order = [f'-{field}', '-id'] if descending else [field, 'id']
+    rows = list(queryset.order_by(*order)[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        value = getattr(rows[-1], field)
+        next_cursor = encode_cursor([value.isoformat() if field == 'created_at' else value, rows[-1].id])
+    return Page(rows, next_cursor)
+
+
+def _ranked(queryset, match, cursor, per_page):
+    # Best bm25 score first (FTS5 scores are negative, lower is better), ties broken by id
+    score = f"bm25({FTS_TABLE}, {', '.join(str(w) for w in FTS_WEIGHTS)})"
+    subquery, params = queryset.order_by().values('id').query.sql_with_params()
+    sql = f"SELECT rowid, {score} FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({subquery})"
+    params = [match, *params]
+
+    key = decode_cursor(cursor)
+    if isinstance(key, list) and len(key) == 2:
+        try:
+            after_score, after_id = float(key[0]), int(key[1])
+            sql += f" AND ({score} > %s OR ({score} = %s AND rowid > %s))"
+            params += [after_score, after_score, after_id]
+        except (TypeError, ValueError):
+            pass
+    sql += f" ORDER BY {score}, rowid LIMIT %s"
+    params.append(per_page + 1)
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        hits = db_cursor.fetchall()
+
+    next_cursor = None
+    if len(hits) > per_page:
+        hits = hits[:per_page]
+        listing_id, last_score = hits[-1]
+        # Same (score, id) order the cursor is read back in
+        next_cursor = encode_cursor([last_score, listing_id])
+    listings = HouseListing.objects.in_bulk([listing_id for listing_id, _ in hits])
+    return Page([listings[listing_id] for listing_id, _ in hits if listing_id in listings], next_cursor)
+
+
+def listing_page(queryset, query='', cursor=None, per_page=PAGE_SIZE, filters=None):
+    """One page of ``queryset`` plus the cursor for the next page (None on the last page).
+
+    With a query and no explicit sort, full-text matches are ranked by
+    relevance when the FTS5 index exists. Otherwise the page follows
+    ``filters['sort']`` (newest first by default), and text search falls back
+    to LIKE matching when there is no index.
+    """
+    filters = filters or {}
+    query = query.strip()
+    queryset = apply_filters(queryset, filters)
+    sort = filters.get('sort', 'relevance' if query else 'newest')
+
+    if query and sort == 'relevance':
+        match = match_expression(query)
+        if match and fts_enabled():
+            return _ranked(queryset, match, cursor, per_page)
+    field, descending = SORTS.get(sort, SORTS['newest'])
+    return _keyset(text_filter(queryset, query), field, descending, cursor, per_page)
+
+
+def serialize_listing(listing):
+    return {
+        'id': listing.id,
+        'title': listing.title,
+        'price': listing.price,
+        'location': listing.location,
+        'bedrooms': listing.bedrooms,
+        'bathrooms': listing.bathrooms,
+        'area': listing.area,
+        'house_age': listing.house_age,
+        'image': listing.image.url if listing.image else None,
+        'url': reverse('house_detail', args=[listing.id]),
+    }
@@ -0,0 +1,193 @@
+import copy
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models
+from django.utils import timezone
+
+from HousePricePrediction.models import HouseListing, Notification, ScheduleVisit
+
+ALIAS = 'index_benchmark'
+
+# Indexes the schema had before the model indexes replaced them. Notification.user
+# lost its foreign-key index (db_index=False) once notif_user_created_idx covered it,
+# so the "without" run must put it back to compare against the real old schema.
+BASELINE_INDEXES = [
+    (Notification, models.Index(fields=['user'], name='notif_user_id_baseline')),
+]
+STATUSES = [choice for choice, _ in ScheduleVisit.STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch SQLite database with synthetic notifications and visits, then "
+        "report query plans and timings for the hot queries with the previous schema (foreign-key indexes only) and with the model indexes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notifications', type=int, default=1_000_000, help="Notification rows to seed")
+        parser.add_argument('--visits', type=int, default=200_000, help="ScheduleVisit rows to seed")
+        parser.add_argument('--users', type=int, default=2000, help="Distinct users")
+        parser.add_argument('--houses', type=int, default=500, help="Distinct house listings")
+        parser.add_argument('--repeat', type=int, default=200, help="Runs per query when timing")
+        parser.add_argument('--db', help="Scratch database file (default: a temporary file, removed afterwards)")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        default = connections.settings['default']
+        if default['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("The index benchmark only runs against SQLite")
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        path = options['db'] or os.path.join(tempfile.mkdtemp(prefix='index-bench-'), 'bench.sqlite3')
+        if os.path.exists(path):
+            raise CommandError(f"{path} already exists; pass a new file")
+        connections.settings[ALIAS] = dict(copy.deepcopy(default), NAME=path)
+
+        self.rng = random.Random(options['seed'])
+        try:
+            self.create_schema()
+            self.seed(options)
+            indexed = [(model, index) for model in (Notification, ScheduleVisit) for index in model._meta.indexes]
+
+            self.set_indexes(indexed, present=False)
+            self.set_indexes(BASELINE_INDEXES, present=True)
+            before = self.run_queries(options)
+            self.set_indexes(BASELINE_INDEXES, present=False)
+            self.set_indexes(indexed, present=True)
+            after = self.run_queries(options)
+            self.report(before, after)
+        finally:
+            connections[ALIAS].close()
+            del connections.settings[ALIAS]
+            if not options['db']:
+                os.remove(path)
+                os.rmdir(os.path.dirname(path))
+
+    def create_schema(self):
+        with connections[ALIAS].schema_editor() as editor:
+            for model in (User, HouseListing, ScheduleVisit, Notification):
+                editor.create_model(model)
+
+    def seed(self, options):
+        started = time.perf_counter()
+        rng = self.rng
+        now = timezone.now()
+        today = date.today()
+
+        User.objects.using(ALIAS).bulk_create(
+            [User(username=f'user{i}', password='!') for i in range(options['users'])], batch_size=2000
+        )
+        HouseListing.objects.using(ALIAS).bulk_create(
+            [HouseListing(title=f'House {i}', price=rng.uniform(5e6, 5e7)) for i in range(options['houses'])],
+            batch_size=2000,
+        )
+        self.user_ids = list(User.objects.using(ALIAS).values_list('id', flat=True))
+        self.house_ids = list(HouseListing.objects.using(ALIAS).values_list('id', flat=True))
+
+        # created_at/scheduled_at are auto_now_add, so spread them out with an UPDATE afterwards
+        self._bulk(Notification, options['notifications'], lambda: Notification(
+            user_id=rng.choice(self.user_ids),
+            message='Synthetic notification',
+            is_read=rng.random() < 0.9,
+        ))
+        self._bulk(ScheduleVisit, options['visits'], lambda: ScheduleVisit(
+            house_id=rng.choice(self.house_ids),
+            user_id=rng.choice(self.user_ids),
+            visit_date=today + timedelta(days=rng.randint(-365, 60)),
+            status=rng.choices(STATUSES, weights=[10, 30, 10, 45, 5])[0],
+        ))
+
+        connection = connections[ALIAS]
+        with connection.cursor() as cursor:
+            epoch = now.timestamp()
+            cursor.execute(
+                f'UPDATE "{Notification._meta.db_table}" '
+                "SET created_at = datetime(%s - (abs(random()) %% 31536000), 'unixepoch')",
+                [epoch],
+            )
+            cursor.execute(
+                f'UPDATE "{ScheduleVisit._meta.db_table}" '
+                "SET scheduled_at = datetime(%s - (abs(random()) %% 31536000), 'unixepoch')",
+                [epoch],
+            )
+        self.stdout.write(
+            f"Seeded {options['notifications']} notifications and {options['visits']} visits "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    def _bulk(self, model, total, make, batch_size=10000):
+        manager = model.objects.using(ALIAS)
+        for start in range(0, total, batch_size):
+            manager.bulk_create([make() for _ in range(min(batch_size, total - start))])
+
+    def set_indexes(self, indexed, present):
+        with connections[ALIAS].schema_editor() as editor:
+            for model, index in indexed:
+                if present:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def queries(self):
+        user_id = self.rng.choice(self.user_ids)
+        house_id = self.rng.choice(self.house_ids)
+        notifications = Notification.objects.using(ALIAS)
+        visits = ScheduleVisit.objects.using(ALIAS)
+        today = date.today()
+        return [
+            ('unread count',
+             notifications.filter(user_id=user_id, is_read=False), lambda qs: qs.count()),
+            ('recent notifications',
+             notifications.filter(user_id=user_id).order_by('-created_at')[:5], list),
+            ('unread notifications',
+             notifications.filter(user_id=user_id, is_read=False).order_by('-created_at')[:20], list),
+            ('pending visit exists',
+             visits.filter(house_id=house_id, user_id=user_id, status='pending'), lambda qs: qs.exists()),
+            ('latest visit',
+             visits.filter(house_id=house_id, user_id=user_id).order_by('-scheduled_at')[:1], list),
+            ('resubmit guard',
+             visits.filter(house_id=house_id, user_id=user_id,
+                           scheduled_at__gte=timezone.now() - timedelta(seconds=10)), lambda qs: qs.exists()),
+            ('pending approvals',
+             visits.filter(status='pending').order_by('visit_date')[:50], list),
+            ('upcoming approved',
+             visits.filter(status='approved', visit_date__gte=today).order_by('visit_date')[:50], list),
+        ]
+
+    def run_queries(self, options):
+        results = {}
+        for label, queryset, _ in self.queries():
+            results[label] = {'plan': queryset.explain(), 'timings': []}
+        for _ in range(options['repeat']):
+            for label, queryset, run in self.queries():
+                started = time.perf_counter()
+                run(queryset)
+                results[label]['timings'].append((time.perf_counter() - started) * 1000)
+        return results
+
+    def report(self, before, after):
+        for label in before:
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            for name, result in (('previous indexes', before[label]), ('model indexes', after[label])):
+                timings = sorted(result['timings'])
+                p95 = timings[int(len(timings) * 0.95) - 1] if timings else 0
+                self.stdout.write(f"  {name}: median {statistics.median(timings):.3f} ms, p95 {p95:.3f} ms")
+                for line in result['plan'].splitlines():
+                    self.stdout.write(f"    {line}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Summary (median ms)"))
+        for label in before:
+            old = statistics.median(before[label]['timings'])
+            new = statistics.median(after[label]['timings'])
+            speedup = old / new if new else float('inf')
+            self.stdout.write(f"  {label:<24} {old:>10.3f} -> {new:>8.3f}  ({speedup:.1f}x)")
@@ -0,0 +1,84 @@
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management.base import BaseCommand, CommandError
+
+from HousePricePrediction import inference
+
+
+def _summary(timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1] if timings else 0
+    return f"median {statistics.median(timings):.3f} ms, p95 {p95:.3f} ms"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time /result/ predictions uncached, as cache misses and as cache hits once the prediction "
+        "cache holds --entries results, and compare raw set() cost with a file-based cache"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=5000, help="Results in the cache before timing")
+        parser.add_argument('--repeat', type=int, default=500, help="Predictions timed per case")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1")
+        bundle = inference.get_model_bundle()
+        if bundle is None or inference.get_neighbor_index() is None:
+            raise CommandError("Prediction system not available")
+
+        rng = random.Random(options['seed'])
+        lows, highs = bundle.bounds.lows.tolist(), bundle.bounds.highs.tolist()
+
+        def random_inputs():
+            return [rng.uniform(low, high) for low, high in zip(lows, highs)]
+
+        def timed(inputs, **kwargs):
+            started = time.perf_counter()
+            output = inference.local_predict_one(inputs, **kwargs)
+            return (time.perf_counter() - started) * 1000, output
+
+        cache = caches['predictions']
+        cache.clear()
+        timed(random_inputs(), use_cache=False)  # load the model and dataset first
+
+        uncached = [timed(random_inputs(), use_cache=False)[0] for _ in range(options['repeat'])]
+
+        started = time.perf_counter()
+        seen = [random_inputs() for _ in range(options['entries'])]
+        for inputs in seen:
+            sample = timed(inputs)[1]
+        self.stdout.write(f"Filled the cache with {options['entries']} results in {time.perf_counter() - started:.1f}s")
+
+        misses = [timed(random_inputs())[0] for _ in range(options['repeat'])]
+        hits = [timed(rng.choice(seen))[0] for _ in range(options['repeat'])]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"local_predict_one ({cache.__class__.__name__})"))
+        self.stdout.write(f"  uncached: {_summary(uncached)}")
+        self.stdout.write(f"  miss:     {_summary(misses)}")
+        self.stdout.write(f"  hit:      {_summary(hits)}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"set() with {options['entries']} entries present"))
+        file_dir = tempfile.mkdtemp(prefix='prediction-cache-bench-')
+        try:
+            file_cache = FileBasedCache(file_dir, {'OPTIONS': {'MAX_ENTRIES': options['entries'] * 2}})
+            for name, backend in ((cache.__class__.__name__, cache), ('FileBasedCache', file_cache)):
+                for i in range(options['entries']):
+                    backend.set(f'fill:{i}', sample)
+                timings = []
+                for i in range(options['repeat']):
+                    started = time.perf_counter()
+                    backend.set(f'bench:{i}', sample)
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(f"  {name:<16} {_summary(timings)}")
+        finally:
+            shutil.rmtree(file_dir, ignore_errors=True)
+            cache.clear()
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Heavy packages a web worker must not load just by importing the URLconf
+DEFAULT_FORBIDDEN = ['matplotlib', 'seaborn', 'pandas', 'numpy', 'sklearn', 'joblib']
+
+BOOT_SCRIPT = (
+    "import django; django.setup(); "
+    "import django.urls; django.urls.get_resolver().url_patterns"
+)
+
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into {module: (self_us, cumulative_us, depth)}."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        except ValueError:
+            continue
+        # Nested imports are indented by two spaces per level after the leading space
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        timings[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return timings
+
+
+class Command(BaseCommand):
+    help = "Report import time of the web worker boot path and fail on heavy imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="Number of slowest modules to list")
+        parser.add_argument('--max-ms', type=float, default=None,
+                            help="Fail if total boot import time exceeds this many milliseconds")
+        parser.add_argument('--forbid', nargs='*', default=DEFAULT_FORBIDDEN,
+                            help="Top-level packages that must not be imported at boot")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'HousePricePrediction.settings'))
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"Boot script failed:\n{proc.stderr[-2000:]}")
+
+        timings = parse_importtime(proc.stderr)
+        # Top-level entries add up to the total
+        total_us = sum(cumulative for _, cumulative, depth in timings.values() if depth == 0)
+
+        self.stdout.write(f"Boot import time: {total_us / 1000:.1f} ms across {len(timings)} modules")
+        slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[:options['top']]
+        for name, (self_us, cumulative_us, _) in slowest:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name}")
+
+        loaded = sorted({name.split('.')[0] for name in timings} & set(options['forbid']))
+        if loaded:
+            raise CommandError(f"Heavy packages imported at boot: {', '.join(loaded)}")
+        if options['max_ms'] is not None and total_us / 1000 > options['max_ms']:
+            raise CommandError(f"Boot import time {total_us / 1000:.1f} ms exceeds {options['max_ms']} ms")
+        self.stdout.write(self.style.SUCCESS("Import-time check passed"))
@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction.retention import prune_read_notifications, database_size, checkpoint, vacuum
+
+
+class Command(BaseCommand):
+    help = "Delete or archive old read notifications in small batches, then optionally compact the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+                            help="Prune read notifications older than this many days")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per transaction")
+        parser.add_argument('--pause', type=float, default=0.05, help="Seconds to sleep between batches")
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches")
+        parser.add_argument('--archive', action='store_true', help="Copy rows to the archive table before deleting")
+        parser.add_argument('--checkpoint', action='store_true', help="Checkpoint and truncate the SQLite WAL afterwards")
+        parser.add_argument('--vacuum', action='store_true', help="VACUUM afterwards (rewrites the whole database)")
+
+    def handle(self, *args, **options):
+        size_before = database_size()
+        started = time.monotonic()
+        pruned, batches = prune_read_notifications(
+            options['days'],
+            batch_size=options['batch_size'],
+            archive=options['archive'],
+            pause=options['pause'],
+            max_batches=options['max_batches'],
+        )
+        elapsed = time.monotonic() - started
+        action = 'Archived' if options['archive'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {pruned} read notification(s) older than {options['days']} day(s) "
+            f"in {batches} batch(es), {elapsed:.2f}s"
+        ))
+
+        if options['checkpoint']:
+            started = time.monotonic()
+            if checkpoint():
+                self.stdout.write(f"WAL checkpoint took {time.monotonic() - started:.2f}s")
+            else:
+                self.stdout.write(self.style.WARNING("Checkpoint only applies to SQLite; skipped"))
+
+        if options['vacuum']:
+            started = time.monotonic()
+            if vacuum():
+                self.stdout.write(f"VACUUM took {time.monotonic() - started:.2f}s")
+            else:
+                self.stdout.write(self.style.WARNING("VACUUM is not supported on this database; skipped"))
+
+        size_after = database_size()
+        if size_before is not None:
+            self.stdout.write(f"Database size: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
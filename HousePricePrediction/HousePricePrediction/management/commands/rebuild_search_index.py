@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from HousePricePrediction.listings import fts_enabled, rebuild_index, invalidate_facets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over house listings"
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError("No FTS5 search index on this database; listing search uses LIKE instead")
+        count = rebuild_index()
+        invalidate_facets()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} listing(s)"))
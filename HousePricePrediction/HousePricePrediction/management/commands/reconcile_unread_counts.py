@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction.models import UnreadCounter
+from HousePricePrediction.notifications import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user unread notification counters from the Notification table"
+
+    def handle(self, *args, **options):
+        before = dict(UnreadCounter.objects.values_list('user_id', 'count'))
+        after = reconcile_unread_counts()
+        drifted = sum(1 for user_id, count in before.items() if after.get(user_id, 0) != count)
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {len(after)} user(s) with unread notifications; fixed {drifted} drifted counter(s)"
+        ))
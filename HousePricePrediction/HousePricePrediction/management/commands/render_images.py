@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction.images import render_pending
+
+
+class Command(BaseCommand):
+    help = "Render resized listing images queued by listing saves and delete superseded ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Listings rendered per batch")
+        parser.add_argument('--loop', action='store_true', help="Keep running, draining every --interval seconds")
+        parser.add_argument('--interval', type=float, default=10.0, help="Seconds between drains with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            done = render_pending(options['batch_size'])
+            if done:
+                self.stdout.write(f"Rendered images for {done} listing(s)")
+            # Keep draining while full batches come back
+            if done == options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction.inference_server import InferenceServer
+
+
+class Command(BaseCommand):
+    help = "Run the prediction service that owns the model, dataset and neighbour index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=settings.INFERENCE_SOCKET, help="Unix socket path to listen on")
+        parser.add_argument('--threads', type=int, default=16,
+                            help="Request threads; concurrent requests are micro-batched into one predict call")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Starting inference server on {options['socket']}")
+        InferenceServer(options['socket'], threads=options['threads']).run()
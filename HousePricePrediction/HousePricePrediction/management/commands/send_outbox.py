@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction.outbox import OutboxSender
+
+
+class Command(BaseCommand):
+    help = "Send queued notification emails from the outbox in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Rows claimed per batch")
+        parser.add_argument('--rate', type=float, default=5.0, help="Maximum emails per second (0 for no limit)")
+        parser.add_argument('--max-attempts', type=int, default=5, help="Attempts before an email is marked failed")
+        parser.add_argument('--loop', action='store_true', help="Keep running, draining every --interval seconds")
+        parser.add_argument('--interval', type=float, default=10.0, help="Seconds between drains with --loop")
+
+    def handle(self, *args, **options):
+        sender = OutboxSender(
+            batch_size=options['batch_size'],
+            rate_per_second=options['rate'],
+            max_attempts=options['max_attempts'],
+        )
+        while True:
+            sent, delivered, failed = sender.drain()
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s) covering {delivered} notification(s), {failed} failed")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
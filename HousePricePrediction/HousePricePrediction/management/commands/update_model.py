@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from HousePricePrediction.incremental import IncrementalUpdateError, update_model
+
+
+class Command(BaseCommand):
+    help = "Fold new, changed and deleted house listings into the price model and publish a new bundle"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Publish even if the current model is not a positive linear model")
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Recompute listing statistics from every stored row instead of the delta")
+        parser.add_argument('--loop', action='store_true', help="Keep running, updating every --interval seconds")
+        parser.add_argument('--interval', type=float, default=300.0, help="Seconds between updates with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            try:
+                added, removed, version = update_model(force=options['force'], rebuild=options['rebuild'])
+            except IncrementalUpdateError as e:
+                raise CommandError(str(e))
+            elapsed = (time.perf_counter() - started) * 1000
+            if version:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Published {version}: {added} listing row(s) added, {removed} removed in {elapsed:.1f} ms"
+                ))
+            elif not options['loop']:
+                self.stdout.write("No listing changes since the last update")
+            if not options['loop']:
+                break
+            # Only the first pass rebuilds
+            options['rebuild'] = False
+            time.sleep(options['interval'])
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-17 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0013_unreadcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedulevisit',
+            index=models.Index(fields=['house', 'user', 'status'], name='visit_house_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulevisit',
+            index=models.Index(fields=['house', 'user', '-scheduled_at'], name='visit_house_user_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulevisit',
+            index=models.Index(fields=['status', 'visit_date'], name='visit_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulevisit',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['house', 'user'], name='visit_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notif_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', '-created_at'], name='notif_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-17 12:40
+
+from django.db import migrations, models
+
+FTS_TABLE = 'houselisting_fts'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        if 'ENABLE_FTS5' not in {row[0] for row in cursor.fetchall()}:
+            # SQLite built without FTS5: listing search falls back to LIKE
+            return
+
+    table = apps.get_model('HousePricePrediction', 'HouseListing')._meta.db_table
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        "title, location, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) "
+        f"SELECT id, title, COALESCE(location, ''), COALESCE(description, '') FROM \"{table}\""
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0015_notificationarchive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='houselisting',
+            index=models.Index(fields=['on_sale', '-created_at', '-id'], name='listing_sale_created_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-17 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0016_houselisting_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='houselisting',
+            index=models.Index(fields=['on_sale', 'price'], name='listing_sale_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='houselisting',
+            index=models.Index(fields=['on_sale', 'location'], name='listing_sale_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='houselisting',
+            index=models.Index(fields=['on_sale', 'bedrooms'], name='listing_sale_bedrooms_idx'),
+        ),
+    ]
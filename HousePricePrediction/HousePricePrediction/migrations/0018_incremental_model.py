@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-17 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0017_houselisting_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncrementalModelState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stats', models.JSONField(blank=True, default=dict)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('bundle_version', models.CharField(blank=True, max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ListingTrainingRow',
+            fields=[
+                ('listing_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('features', models.JSONField()),
+                ('price', models.FloatField()),
+                ('listing_updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
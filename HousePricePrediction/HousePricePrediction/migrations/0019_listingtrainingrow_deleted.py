@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0018_incremental_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingtrainingrow',
+            name='deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='listingtrainingrow',
+            index=models.Index(condition=models.Q(('deleted', True)), fields=['listing_id'], name='training_row_deleted_idx'),
+        ),
+    ]
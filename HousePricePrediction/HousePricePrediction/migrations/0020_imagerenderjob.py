@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0019_listingtrainingrow_deleted'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageRenderJob',
+            fields=[
+                ('listing_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('queued_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['queued_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,193 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import joblib
+
+from .features import FEATURES, FeatureBounds, bounds_path
+from .linear_predictor import compile_linear
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 1
+
+
+class BundleError(Exception):
+    pass
+
+
+class ModelBundle:
+    """A trained estimator together with everything needed to serve it."""
+
+    def __init__(self, estimator, bounds, features=FEATURES, metrics=None,
+                 data_hash='', version='', created_at=''):
+        self.estimator = estimator
+        self.bounds = bounds
+        self.features = list(features)
+        self.metrics = metrics or {}
+        self.data_hash = data_hash
+        self.version = version
+        self.created_at = created_at
+        # Linear models are served as a bare dot product, skipping sklearn's per-call validation
+        self.linear = compile_linear(estimator, self.features)
+
+    def validate(self):
+        if self.features != list(FEATURES):
+            raise BundleError(f"Bundle features {self.features} do not match {FEATURES}")
+        if self.bounds.features != self.features:
+            raise BundleError("Clamp bounds do not match the bundle features")
+        n_features = getattr(self.estimator, 'n_features_in_', len(self.features))
+        if n_features != len(self.features):
+            raise BundleError(f"Estimator expects {n_features} features, not {len(self.features)}")
+
+    def predict(self, matrix):
+        if self.linear is not None:
+            return self.linear.predict_many(matrix)
+        return self.estimator.predict(matrix)
+
+    def predict_one(self, row):
+        if self.linear is not None:
+            return self.linear.predict_one(row)
+        return float(self.estimator.predict([row])[0])
+
+
+def save_bundle(path, estimator, bounds, metrics=None, data_hash=''):
+    """Write a bundle atomically so a watching worker never sees a partial file."""
+    created_at = datetime.now(timezone.utc)
+    payload = {
+        'format': BUNDLE_FORMAT,
+        'version': created_at.strftime('%Y%m%d%H%M%S') + (f"-{data_hash[:8]}" if data_hash else ''),
+        'created_at': created_at.isoformat(),
+        'estimator': estimator,
+        'features': list(bounds.features),
+        'bounds': bounds.to_dict(),
+        'metrics': metrics or {},
+        'data_hash': data_hash,
+    }
+    ModelBundle(estimator, bounds, payload['features']).validate()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        # Uncompressed so numpy arrays can be memory-mapped on load
+        joblib.dump(payload, tmp_path)
+        # mkstemp creates 0600; web workers may run as a different user than the trainer
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return payload['version']
+
+
+def load_bundle(path, mmap_mode='r'):
+    payload = joblib.load(path, mmap_mode=mmap_mode)
+    if not isinstance(payload, dict) or payload.get('format') != BUNDLE_FORMAT:
+        raise BundleError(f"{path} is not a model bundle")
+    bundle = ModelBundle(
+        payload['estimator'],
+        FeatureBounds.from_dict(payload['bounds']),
+        features=payload['features'],
+        metrics=payload.get('metrics'),
+        data_hash=payload.get('data_hash', ''),
+        version=payload.get('version', ''),
+        created_at=payload.get('created_at', ''),
+    )
+    bundle.validate()
+    return bundle
+
+
+def load_legacy_model(model_path, fallback_bounds=None):
+    """Wrap a bare my_new_model.pkl (and its .bounds.json, if any) as a bundle."""
+    estimator = joblib.load(model_path)
+    try:
+        bounds = FeatureBounds.load(bounds_path(model_path))
+    except OSError:
+        if fallback_bounds is None:
+            raise
+        bounds = fallback_bounds()
+    # Version changes whenever the pickle is replaced, so caches keyed on it stay correct
+    bundle = ModelBundle(estimator, bounds, version=f"legacy-{int(os.path.getmtime(model_path))}")
+    bundle.validate()
+    return bundle
+
+
+class ModelStore:
+    """Lazily loads the current bundle and swaps in newer ones without a restart."""
+
+    def __init__(self, path, legacy_model_path=None, fallback_bounds=None, check_interval=30):
+        self.path = str(path)
+        self.legacy_model_path = str(legacy_model_path) if legacy_model_path else None
+        self.fallback_bounds = fallback_bounds
+        self.check_interval = check_interval
+        self._bundle = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._watcher_pid = None
+
+    def get(self):
+        bundle = self._bundle
+        if bundle is None:
+            with self._lock:
+                if self._bundle is None:
+                    self._load()
+                bundle = self._bundle
+        if self._watcher_pid != os.getpid():
+            self._start_watcher()
+        return bundle
+
+    def _load(self):
+        if os.path.exists(self.path):
+            self._mtime = os.path.getmtime(self.path)
+            self._bundle = load_bundle(self.path)
+            logger.info(f"Loaded model bundle {self._bundle.version} from {self.path}")
+        elif self.legacy_model_path:
+            self._bundle = load_legacy_model(self.legacy_model_path, self.fallback_bounds)
+            logger.info(f"Loaded legacy model from {self.legacy_model_path}")
+        else:
+            raise BundleError(f"No model bundle at {self.path}")
+
+    def reload_if_changed(self):
+        """Swap in the bundle on disk if it is newer than the one being served."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+
+        try:
+            bundle = load_bundle(self.path)
+        except Exception as e:
+            # Keep serving the current model if the new one is broken
+            logger.error(f"Ignoring invalid model bundle {self.path}: {str(e)}")
+            self._mtime = mtime
+            return False
+
+        with self._lock:
+            self._bundle = bundle
+            self._mtime = mtime
+        logger.info(f"Hot-reloaded model bundle {bundle.version}")
+        return True
+
+    def _start_watcher(self):
+        # Started on first use in each process, since threads do not survive fork
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+        if self.check_interval <= 0:
+            return
+        threading.Thread(target=self._watch, name='model-bundle-watcher', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"Model bundle check failed: {str(e)}")
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.utils import timezone
 
 class HouseListing(models.Model):
     user = models.ForeignKey(
@@ -32,6 +34,14 @@ class HouseListing(models.Model):
         ordering = ['-created_at']
         verbose_name = 'House Listing'
         verbose_name_plural = 'House Listings'
+        indexes = [
+            # Keyset pagination of the listings page: on_sale rows, newest first
+            models.Index(fields=['on_sale', '-created_at', '-id'], name='listing_sale_created_idx'),
+            # Range filters, sorting and facet counts over listings for sale
+            models.Index(fields=['on_sale', 'price'], name='listing_sale_price_idx'),
+            models.Index(fields=['on_sale', 'location'], name='listing_sale_location_idx'),
+            models.Index(fields=['on_sale', 'bedrooms'], name='listing_sale_bedrooms_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -65,6 +75,15 @@ class ScheduleVisit(models.Model):
         ordering = ['visit_date', 'visit_time']
         verbose_name = 'Scheduled Visit'
         verbose_name_plural = 'Scheduled Visits'
+        indexes = [
+            # Duplicate/pending checks on the house page and when scheduling
+            models.Index(fields=['house', 'user', 'status'], name='visit_house_user_status_idx'),
+            # Latest visit per house and user (check_visit_status, the 10 second resubmit guard)
+            models.Index(fields=['house', 'user', '-scheduled_at'], name='visit_house_user_sched_idx'),
+            # Admin approval queue filtered by status and ordered by date
+            models.Index(fields=['status', 'visit_date'], name='visit_status_date_idx'),
+            models.Index(fields=['house', 'user'], name='visit_pending_idx', condition=Q(status='pending')),
+        ]
 
     def __str__(self):
         return f"{self.user.username} → {self.house.title} on {self.visit_date}"
@@ -77,7 +96,8 @@ class Notification(models.Model):
         ('admin', 'Admin Alert'),
     )
     
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    # No separate FK index: notif_user_created_idx starts with user and serves the same lookups
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications', db_index=False)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -86,7 +106,119 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Dropdown and notifications page: newest first for one user
+            models.Index(fields=['user', '-created_at'], name='notif_user_created_idx'),
+            # Only unread rows, which stay few while the table keeps growing
+            models.Index(fields=['user', '-created_at'], name='notif_unread_idx', condition=Q(is_read=False)),
+        ]
         
     def mark_as_read(self):
         self.is_read = True
-        self.save()
\ No newline at end of file
+        self.save()
+
+
+# Read notifications moved out of the live table by `manage.py prune_notifications --archive`
+class NotificationArchive(models.Model):
+    original_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.TextField()
+    notification_type = models.CharField(max_length=20)
+    link = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notif_archive_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.message[:40]}"
+
+
+# Listing rows already folded into the price model by `manage.py update_model`.
+# Keyed by listing id without a foreign key, so a deleted listing's row can still be subtracted.
+class ListingTrainingRow(models.Model):
+    listing_id = models.BigIntegerField(primary_key=True)
+    features = models.JSONField()
+    price = models.FloatField()
+    listing_updated_at = models.DateTimeField()
+    # Set when the listing is deleted; the next update subtracts and drops the row
+    deleted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['listing_id'], name='training_row_deleted_idx', condition=Q(deleted=True)),
+        ]
+
+    def __str__(self):
+        return f"Listing {self.listing_id}: {self.price}"
+
+
+# Single row: running statistics over ListingTrainingRow and the last delta processed
+class IncrementalModelState(models.Model):
+    stats = models.JSONField(default=dict, blank=True)
+    watermark = models.DateTimeField(blank=True, null=True)
+    bundle_version = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Incremental model {self.bundle_version or '(unpublished)'}"
+
+
+# Listings whose resized images still need rendering; drained by `manage.py render_images`
+class ImageRenderJob(models.Model):
+    listing_id = models.BigIntegerField(primary_key=True)
+    queued_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['queued_at']
+
+    def __str__(self):
+        return f"Render images for listing {self.listing_id}"
+
+
+# Denormalized unread count per user, kept in step by the notifications service
+class UnreadCounter(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.count} unread"
+
+
+# Emails queued in the same transaction as their notifications; sent by `manage.py send_outbox`
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='outbox_emails', null=True, blank=True)
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Outbox Emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject} ({self.status})"
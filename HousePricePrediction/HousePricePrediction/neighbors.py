@@ -0,0 +1,44 @@
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from .features import FEATURES, TARGET
+
+
+class NeighborIndex:
+    """Comparable-property lookup over the model features, built once per process."""
+
+    def __init__(self, df, features=FEATURES, price_col=TARGET):
+        self.features = list(features)
+        self.price_col = price_col
+
+        # Rows sorted by price so a price band is one contiguous slice
+        self.rows = df.sort_values(price_col, kind='stable').reset_index(drop=True)
+        self.points = np.ascontiguousarray(self.rows[self.features].to_numpy(dtype=np.float64))
+        self.prices = self.rows[price_col].to_numpy(dtype=np.float64)
+        self.tree = KDTree(self.points)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def nearest(self, point):
+        """Return the row closest to ``point`` (plain Euclidean distance)."""
+        query = np.asarray(point, dtype=np.float64).reshape(1, -1)
+        _, idx = self.tree.query(query, k=1)
+        return self.rows.iloc[int(idx[0, 0])]
+
+    def similar(self, point, lower, upper, k=5):
+        """Return up to ``k`` rows priced within [lower, upper], closest first."""
+        start = np.searchsorted(self.prices, lower, side='left')
+        stop = np.searchsorted(self.prices, upper, side='right')
+        if stop <= start:
+            return self.rows.iloc[0:0]
+
+        diff = self.points[start:stop] - np.asarray(point, dtype=np.float64)
+        dist = np.einsum('ij,ij->i', diff, diff)
+
+        if dist.size > k:
+            top = np.argpartition(dist, k - 1)[:k]
+        else:
+            top = np.arange(dist.size)
+        top = top[np.argsort(dist[top], kind='stable')]
+        return self.rows.iloc[start + top]
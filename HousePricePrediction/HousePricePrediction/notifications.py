@@ -0,0 +1,141 @@
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, EmailOutbox, UnreadCounter
+from .events import publish_notifications, publish_unread_changed, touch_marker
+
+logger = logging.getLogger(__name__)
+
+# Notification types that are also sent by email
+EMAIL_TYPES = ('alert', 'important')
+
+
+def bulk_notify(items):
+    """Create notifications from (user, message, link, notification_type) tuples in bulk.
+
+    Emails for alert-type notifications are written to the outbox in the same
+    transaction and sent later by `manage.py send_outbox`, so the request never
+    waits on SMTP and a failed send is retried instead of lost.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create([
+            Notification(user=user, message=message, link=link, notification_type=notification_type)
+            for user, message, link, notification_type in items
+        ])
+        emails = [
+            EmailOutbox(user=user, recipient=user.email, subject='New Notification', body=message)
+            for user, message, _, notification_type in items
+            if notification_type in EMAIL_TYPES and user.email
+        ]
+        if emails:
+            EmailOutbox.objects.bulk_create(emails)
+        _increment_unread(Counter(notification.user_id for notification in notifications))
+        # Push to open browser tabs only once the rows are visible to other connections
+        transaction.on_commit(lambda: publish_notifications(notifications))
+
+    logger.info(f"Created {len(notifications)} notification(s), queued {len(emails)} email(s)")
+    return notifications
+
+
+def notify_users(users, message, link='', notification_type='info'):
+    """Send the same notification to several users with one bulk INSERT."""
+    return bulk_notify((user, message, link, notification_type) for user in users)
+
+
+def create_notification(user, message, link='', notification_type='info'):
+    return notify_users([user], message, link=link, notification_type=notification_type)[0]
+
+
+# Unread counters
+
+def reconcile_unread_counts(user_ids=None):
+    """Recompute counters from the Notification table (all users, or just ``user_ids``)."""
+    unread = Notification.objects.filter(is_read=False)
+    counters = UnreadCounter.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        unread = unread.filter(user_id__in=user_ids)
+        counters = counters.filter(user_id__in=user_ids)
+
+    counts = dict(unread.values_list('user_id').annotate(n=Count('id')).values_list('user_id', 'n'))
+    if user_ids is not None:
+        for user_id in user_ids:
+            counts.setdefault(user_id, 0)
+
+    with transaction.atomic():
+        previous = dict(counters.values_list('user_id', 'count'))
+        counters.exclude(user_id__in=list(counts)).update(count=0)
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id, count=n) for user_id, n in counts.items()],
+            update_conflicts=True, unique_fields=['user'], update_fields=['count'],
+        )
+    # Open tabs may be showing a counter fixed up here (a new counter has not been shown yet)
+    for user_id, count in previous.items():
+        if counts.get(user_id, 0) != count:
+            touch_marker(user_id)
+    return counts
+
+
+def _increment_unread(per_user):
+    existing = set(UnreadCounter.objects.filter(user_id__in=list(per_user)).values_list('user_id', flat=True))
+    missing = [user_id for user_id in per_user if user_id not in existing]
+    if missing:
+        # First notification for these users since counters were introduced
+        reconcile_unread_counts(missing)
+
+    by_amount = defaultdict(list)
+    for user_id, amount in per_user.items():
+        if user_id in existing:
+            by_amount[amount].append(user_id)
+    for amount, user_ids in by_amount.items():
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(count=F('count') + amount)
+
+
+def _set_unread(user, value):
+    UnreadCounter.objects.update_or_create(user=user, defaults={'count': value})
+
+
+def unread_count(user):
+    """O(1) unread badge lookup; builds the counter on first use."""
+    count = UnreadCounter.objects.filter(user=user).values_list('count', flat=True).first()
+    if count is None:
+        count = reconcile_unread_counts([user.id])[user.id]
+    return count
+
+
+def mark_read(notification):
+    with transaction.atomic():
+        changed = Notification.objects.filter(id=notification.id, is_read=False).update(is_read=True)
+        if changed:
+            UnreadCounter.objects.filter(user_id=notification.user_id).update(
+                count=Greatest(F('count') - changed, 0)
+            )
+    notification.is_read = True
+    if changed:
+        publish_unread_changed(notification.user_id)
+    return changed
+
+
+def mark_all_read(user):
+    with transaction.atomic():
+        changed = Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+        _set_unread(user, 0)
+    if changed:
+        publish_unread_changed(user.id)
+    return changed
+
+
+def clear_all(user):
+    with transaction.atomic():
+        deleted, _ = Notification.objects.filter(user=user).delete()
+        _set_unread(user, 0)
+    publish_unread_changed(user.id)
+    return deleted
@@ -0,0 +1,140 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxSender:
+    """Drains EmailOutbox over one persistent SMTP connection.
+
+    Several pending emails to the same recipient are coalesced into a single
+    digest. Sends are rate-limited, and failures are retried with exponential
+    backoff until ``max_attempts`` is reached.
+    """
+
+    def __init__(self, batch_size=100, rate_per_second=5.0, max_attempts=5,
+                 backoff_base=30, backoff_max=3600, stale_after=600, connection=None):
+        self.batch_size = batch_size
+        self.min_interval = 1.0 / rate_per_second if rate_per_second else 0
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stale_after = stale_after
+        self.connection = connection
+        self._last_send = 0.0
+
+    def release_stale(self):
+        # Rows left in 'sending' by a sender that died mid-batch
+        cutoff = timezone.now() - timedelta(seconds=self.stale_after)
+        return EmailOutbox.objects.filter(status='sending', updated_at__lt=cutoff).update(
+            status='pending', claim_token='', updated_at=timezone.now()
+        )
+
+    def claim(self):
+        """Mark up to ``batch_size`` due rows as ours so concurrent senders never double-send."""
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        due = EmailOutbox.objects.filter(status='pending', next_attempt_at__lte=now).order_by('created_at')
+        ids = list(due.values_list('id', flat=True)[:self.batch_size])
+        if not ids:
+            return []
+        EmailOutbox.objects.filter(id__in=ids, status='pending').update(
+            status='sending', claim_token=token, updated_at=now
+        )
+        return list(EmailOutbox.objects.filter(claim_token=token, status='sending').order_by('created_at'))
+
+    def build_digests(self, rows):
+        groups = OrderedDict()
+        for row in rows:
+            groups.setdefault(row.recipient, []).append(row)
+
+        digests = []
+        for recipient, items in groups.items():
+            if len(items) == 1:
+                subject, body = items[0].subject, items[0].body
+            else:
+                subject = f"You have {len(items)} new notifications"
+                body = "\n\n".join(f"- {item.body}" for item in items)
+            digests.append((recipient, subject, body, items))
+        return digests
+
+    def _throttle(self):
+        wait = self.min_interval - (time.monotonic() - self._last_send)
+        if wait > 0:
+            time.sleep(wait)
+        self._last_send = time.monotonic()
+
+    def _mark_failed(self, items, error):
+        now = timezone.now()
+        for item in items:
+            item.attempts += 1
+            item.last_error = str(error)[:1000]
+            item.claim_token = ''
+            item.updated_at = now
+            if item.attempts >= self.max_attempts:
+                item.status = 'failed'
+                logger.error(f"Giving up on email {item.id} to {item.recipient}: {item.last_error}")
+            else:
+                item.status = 'pending'
+                delay = min(self.backoff_base * 2 ** (item.attempts - 1), self.backoff_max)
+                item.next_attempt_at = now + timedelta(seconds=delay)
+        EmailOutbox.objects.bulk_update(
+            items, ['attempts', 'last_error', 'claim_token', 'status', 'next_attempt_at', 'updated_at']
+        )
+
+    def send_batch(self, rows, connection):
+        """Send claimed rows as digests. Returns (emails sent, rows delivered, rows failed)."""
+        sent = delivered = failed = 0
+        for recipient, subject, body, items in self.build_digests(rows):
+            self._throttle()
+            try:
+                EmailMessage(
+                    subject, body, settings.DEFAULT_FROM_EMAIL, [recipient], connection=connection
+                ).send()
+            except Exception as e:
+                self._mark_failed(items, e)
+                failed += len(items)
+                # Drop a possibly broken session; the next send reconnects
+                connection.close()
+                continue
+            EmailOutbox.objects.filter(id__in=[item.id for item in items]).update(
+                status='sent', sent_at=timezone.now(), claim_token='', updated_at=timezone.now()
+            )
+            sent += 1
+            delivered += len(items)
+        return sent, delivered, failed
+
+    def drain(self):
+        """Send batches over one connection until nothing is due.
+
+        Returns (emails sent, rows delivered, rows failed).
+        """
+        self.release_stale()
+        totals = (0, 0, 0)
+        connection = self.connection or get_connection()
+        try:
+            while True:
+                rows = self.claim()
+                if not rows:
+                    break
+                try:
+                    connection.open()
+                except Exception as e:
+                    # Mail server unreachable: back these off and stop until the next run
+                    self._mark_failed(rows, e)
+                    totals = (totals[0], totals[1], totals[2] + len(rows))
+                    break
+                totals = tuple(a + b for a, b in zip(totals, self.send_batch(rows, connection)))
+        finally:
+            if self.connection is None:
+                connection.close()
+        return totals
@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+logger = logging.getLogger(__name__)
+
+
+def prune_read_notifications(older_than_days, batch_size=1000, archive=False, pause=0.0, max_batches=None):
+    """Delete (or archive) read notifications older than ``older_than_days``.
+
+    Rows go in batches of ``batch_size``, each in its own short transaction,
+    so other writers only ever wait for one batch. Unread rows are never
+    touched, which keeps the per-user unread counters valid.
+
+    Returns (rows pruned, batches).
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    pruned = batches = 0
+
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            candidates = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by('id')
+            if archive:
+                rows = list(candidates[:batch_size])
+                ids = [row.id for row in rows]
+            else:
+                ids = list(candidates.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+
+            if archive:
+                NotificationArchive.objects.bulk_create([
+                    NotificationArchive(
+                        original_id=row.id, user_id=row.user_id, message=row.message,
+                        notification_type=row.notification_type, link=row.link, created_at=row.created_at,
+                    )
+                    for row in rows
+                ], ignore_conflicts=True)
+
+            # Re-check is_read so a row marked unread in the meantime stays put
+            deleted, _ = Notification.objects.filter(id__in=ids, is_read=True).delete()
+            if archive and deleted < len(ids):
+                kept = Notification.objects.filter(id__in=ids).values_list('id', flat=True)
+                NotificationArchive.objects.filter(original_id__in=list(kept)).delete()
+
+        pruned += deleted
+        batches += 1
+        if pause:
+            time.sleep(pause)
+
+    logger.info(f"Pruned {pruned} read notification(s) older than {older_than_days} day(s) in {batches} batch(es)")
+    return pruned, batches
+
+
+def database_size():
+    """Size in bytes of the SQLite database file plus its WAL, or None on other backends."""
+    if connection.vendor != 'sqlite':
+        return None
+    path = str(connection.settings_dict['NAME'])
+    return sum(os.path.getsize(p) for p in (path, f'{path}-wal') if os.path.exists(p))
+
+
+def checkpoint():
+    """Fold the SQLite write-ahead log back into the main file and truncate it."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return True
+
+
+def vacuum():
+    """Give the space freed by pruning back to the filesystem."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('VACUUM')
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f'VACUUM ANALYZE "{Notification._meta.db_table}"')
+        else:
+            return False
+    return True
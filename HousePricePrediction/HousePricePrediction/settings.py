@@ -2,6 +2,8 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+from HousePricePrediction.heatmap import default_cache_dir as heatmap_cache_dir
+
 # FIRST define BASE_DIR before using it
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -59,7 +61,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                
+                'HousePricePrediction.context_processors.notifications',
             ],
         },
     },
@@ -134,6 +136,62 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER or 'noreply@example.com')
 
+# Housing dataset and its memory-mapped columnar cache
+DATASET_PATH = os.getenv('DATASET_PATH', str(BASE_DIR / 'kathmandudataset.xlsx'))
+DATASET_CACHE_DIR = os.getenv('DATASET_CACHE_DIR', str(BASE_DIR / '.dataset_cache'))
+HEATMAP_CACHE_DIR = heatmap_cache_dir()
+# Resized, metadata-free copies of listing images, rendered by `manage.py render_images`
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', str(BASE_DIR / '.image_cache'))
+
+# Prediction model bundle (written by train_model.py) and hot-reload check interval in seconds
+MODEL_BUNDLE_PATH = os.getenv('MODEL_BUNDLE_PATH', str(BASE_DIR / 'house_price_bundle.joblib'))
+MODEL_RELOAD_INTERVAL = int(os.getenv('MODEL_RELOAD_INTERVAL', 30))
+
+# Inference backend: 'local' runs the model in each web worker, 'remote' calls
+# the server started with `manage.py run_inference_server` over a Unix socket
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'local')
+INFERENCE_SOCKET = os.getenv('INFERENCE_SOCKET', str(BASE_DIR / 'inference.sock'))
+INFERENCE_POOL_SIZE = int(os.getenv('INFERENCE_POOL_SIZE', 4))
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', 2.0))
+
+# Micro-batching of concurrent single predictions: flush after this many ms or rows.
+# Set the window to 0 to predict each request on its own. Off by default in local
+# mode, where sync workers serve one request at a time and have nothing to batch.
+PREDICTION_BATCH_WINDOW_MS = float(os.getenv(
+    'PREDICTION_BATCH_WINDOW_MS', 2 if INFERENCE_BACKEND == 'remote' else 0
+))
+PREDICTION_BATCH_MAX_ROWS = int(os.getenv('PREDICTION_BATCH_MAX_ROWS', 64))
+
+# Per-user change markers that let notification streams in every worker skip idle queries
+NOTIFICATION_MARKER_DIR = os.getenv('NOTIFICATION_MARKER_DIR', str(BASE_DIR / '.notification_markers'))
+
+# Read notifications older than this are removed by `manage.py prune_notifications`
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+
+# Caches. Predictions are kept in a per-process LRU: a set() costs the same however
+# many entries exist, unlike FileBasedCache, which lists its directory on every set()
+# (see `manage.py benchmark_prediction_cache`). Entries are keyed on model and dataset
+# version so retraining invalidates them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'predictions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'predictions',
+        'TIMEOUT': int(os.getenv('PREDICTION_CACHE_TTL', 3600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('PREDICTION_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+    # Listing facet counts, shared by all workers so a save in one invalidates them everywhere
+    'listings': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('LISTING_CACHE_DIR', str(BASE_DIR / '.listing_cache')),
+        'TIMEOUT': int(os.getenv('LISTING_CACHE_TTL', 600)),
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,234 @@
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from .features import FEATURES, TARGET, FeatureBounds, clean_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def stats_path(model_path):
+    """Training statistics are stored next to the bundle, e.g. house_price_bundle.stats.json."""
+    return os.path.splitext(str(model_path))[0] + '.stats.json'
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrames of at most ``chunksize`` rows from a CSV, Parquet or xlsx file.
+
+    CSV and Parquet are read incrementally. xlsx cannot be streamed, so the
+    workbook is read once and sliced (fine for the size of today's dataset).
+    """
+    import pandas as pd
+
+    path = str(path)
+    if path.endswith('.csv'):
+        for frame in pd.read_csv(path, chunksize=chunksize):
+            frame.columns = frame.columns.str.strip()
+            yield frame
+    elif path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet needs pyarrow installed")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            frame = batch.to_pandas()
+            frame.columns = frame.columns.str.strip()
+            yield frame
+    else:
+        from .dataset import read_source
+        data = read_source(path)
+        for start in range(0, len(data), chunksize):
+            yield data.iloc[start:start + chunksize]
+
+
+class LeastSquaresStats:
+    """Sufficient statistics for a linear least-squares fit, updated chunk by chunk.
+
+    Holds the row count, feature/target means, the centred moments XᵀX, Xᵀy
+    and yᵀy, and per-feature min/max, so memory does not depend on the number
+    of rows. Chunks are merged with the pairwise (Chan et al.) update, which
+    stays accurate where raw sums of squares of incomes would lose precision.
+    """
+
+    def __init__(self, features=FEATURES):
+        self.features = list(features)
+        d = len(self.features)
+        self.n = 0
+        self.mean_x = np.zeros(d)
+        self.mean_y = 0.0
+        self.xtx = np.zeros((d, d))
+        self.xty = np.zeros(d)
+        self.yty = 0.0
+        self.lows = np.full(d, np.inf)
+        self.highs = np.full(d, -np.inf)
+
+    @classmethod
+    def from_rows(cls, X, y, features=FEATURES):
+        return cls(features).update(X, y)
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if not len(y):
+            return self
+        mean_x, mean_y = X.mean(axis=0), y.mean()
+        Xc, yc = X - mean_x, y - mean_y
+        other = LeastSquaresStats(self.features)
+        other.n, other.mean_x, other.mean_y = len(y), mean_x, mean_y
+        other.xtx, other.xty, other.yty = Xc.T @ Xc, Xc.T @ yc, float(yc @ yc)
+        other.lows, other.highs = X.min(axis=0), X.max(axis=0)
+        return self.merge(other)
+
+    def update_frame(self, frame):
+        """Clean a raw chunk the same way train_model.py does, then add it."""
+        frame = clean_rows(frame, self.features)
+        return self.update(frame[self.features].to_numpy(), frame[TARGET].to_numpy())
+
+    def merge(self, other):
+        if not other.n:
+            return self
+        total = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / total
+        self.xtx = self.xtx + other.xtx + weight * np.outer(dx, dx)
+        self.xty = self.xty + other.xty + weight * dx * dy
+        self.yty = self.yty + other.yty + weight * dy * dy
+        self.mean_x = self.mean_x + dx * other.n / total
+        self.mean_y = self.mean_y + dy * other.n / total
+        self.n = total
+        self.lows = np.minimum(self.lows, other.lows)
+        self.highs = np.maximum(self.highs, other.highs)
+        return self
+
+    def subtract(self, other):
+        """Remove rows previously added (the inverse of ``merge``); min/max are left as they are."""
+        if not other.n:
+            return self
+        if other.n > self.n:
+            raise ValueError("Cannot remove more rows than were added")
+        if other.n == self.n:
+            lows, highs = self.lows, self.highs
+            self.__init__(self.features)
+            self.lows, self.highs = lows, highs
+            return self
+        remaining = self.n - other.n
+        mean_x = (self.n * self.mean_x - other.n * other.mean_x) / remaining
+        mean_y = (self.n * self.mean_y - other.n * other.mean_y) / remaining
+        dx = other.mean_x - mean_x
+        dy = other.mean_y - mean_y
+        weight = remaining * other.n / self.n
+        self.xtx = self.xtx - other.xtx - weight * np.outer(dx, dx)
+        self.xty = self.xty - other.xty - weight * dx * dy
+        self.yty = self.yty - other.yty - weight * dy * dy
+        self.mean_x, self.mean_y, self.n = mean_x, mean_y, remaining
+        return self
+
+    def copy(self):
+        return LeastSquaresStats.from_dict(self.to_dict())
+
+    def solve(self, positive=True):
+        """Return (coef, intercept), with coef >= 0 when ``positive``.
+
+        Same problem LinearRegression(positive=True) solves: NNLS on centred
+        data. The normal equations are factored (AᵀA = XᵀX, Aᵀb = Xᵀy) so
+        NNLS only ever sees a d×d system.
+        """
+        if self.n < 2:
+            raise ValueError("Need at least two rows to fit")
+        # Scale columns to unit norm for conditioning; positive scaling keeps w >= 0 equivalent
+        scale = np.sqrt(np.diag(self.xtx))
+        scale[scale == 0] = 1.0
+        xtx = self.xtx / np.outer(scale, scale)
+        xty = self.xty / scale
+
+        if positive:
+            from scipy.optimize import nnls
+            eigvals, eigvecs = np.linalg.eigh(xtx)
+            keep = eigvals > eigvals.max() * 1e-12
+            root = np.sqrt(eigvals[keep])
+            A = root[:, None] * eigvecs[:, keep].T
+            b = (eigvecs[:, keep].T @ xty) / root
+            coef, _ = nnls(A, b)
+        else:
+            coef = np.linalg.lstsq(xtx, xty, rcond=None)[0]
+
+        coef = coef / scale
+        intercept = self.mean_y - float(self.mean_x @ coef)
+        return coef, intercept
+
+    def residual_sum_of_squares(self, coef):
+        return float(self.yty - 2 * coef @ self.xty + coef @ self.xtx @ coef)
+
+    def bounds(self):
+        return FeatureBounds(self.lows, self.highs, self.features)
+
+    def to_dict(self):
+        return {
+            'features': self.features,
+            'n': self.n,
+            'mean_x': self.mean_x.tolist(),
+            'mean_y': self.mean_y,
+            'xtx': self.xtx.tolist(),
+            'xty': self.xty.tolist(),
+            'yty': self.yty,
+            # None for a feature with no rows yet (inf is not valid JSON)
+            'lows': [float(v) if np.isfinite(v) else None for v in self.lows],
+            'highs': [float(v) if np.isfinite(v) else None for v in self.highs],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['features'])
+        stats.n = data['n']
+        stats.mean_x = np.asarray(data['mean_x'], dtype=np.float64)
+        stats.mean_y = float(data['mean_y'])
+        stats.xtx = np.asarray(data['xtx'], dtype=np.float64)
+        stats.xty = np.asarray(data['xty'], dtype=np.float64)
+        stats.yty = float(data['yty'])
+        stats.lows = np.array([np.inf if v is None else v for v in data['lows']], dtype=np.float64)
+        stats.highs = np.array([-np.inf if v is None else v for v in data['highs']], dtype=np.float64)
+        return stats
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.to_dict(), f)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def build_estimator(coef, intercept, features=FEATURES, positive=True):
+    """A fitted LinearRegression carrying the given coefficients, pickled like train_model.py's."""
+    from sklearn.linear_model import LinearRegression
+    model = LinearRegression(positive=positive)
+    model.coef_ = np.asarray(coef, dtype=np.float64)
+    model.intercept_ = float(intercept)
+    model.n_features_in_ = len(features)
+    model.feature_names_in_ = np.asarray(features, dtype=object)
+    return model
+
+
+def fit_streaming(path, chunksize=DEFAULT_CHUNKSIZE, positive=True):
+    """One pass over ``path`` in chunks. Returns (estimator, bounds, stats)."""
+    stats = LeastSquaresStats()
+    for i, chunk in enumerate(iter_chunks(path, chunksize)):
+        stats.update_frame(chunk)
+        logger.info(f"Chunk {i + 1}: {stats.n} rows so far")
+    coef, intercept = stats.solve(positive=positive)
+    return build_estimator(coef, intercept, stats.features, positive), stats.bounds(), stats
@@ -0,0 +1,15 @@
+from django import template
+
+from HousePricePrediction.images import derivative_url, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(listing, fmt='jpg'):
+    return srcset(listing, fmt)
+
+
+@register.simple_tag
+def image_url(listing, width, fmt='jpg'):
+    return derivative_url(listing, int(width), fmt)
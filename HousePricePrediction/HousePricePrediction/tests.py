@@ -0,0 +1,330 @@
+import asyncio
+import csv
+import json
+import os
+import socket
+import tempfile
+import threading
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import bulk, events, training
+from .features import FEATURES, FeatureBounds
+from .inference_server import HEADER, InferenceClient, InferenceServer
+from .linear_predictor import LinearPredictor, compile_linear
+from .model_bundle import ModelBundle
+from .listings import fts_enabled, listing_page
+from .models import HouseListing, Notification, ScheduleVisit, UnreadCounter
+from .notifications import bulk_notify, reconcile_unread_counts
+from .visits import approve_visits, reject_visits
+
+
+class RankedSearchPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(9):
+            HouseListing.objects.create(
+                title=f"House {i}" if i % 2 else f"Family house with garden {i}",
+                price=1_000_000 + i,
+                location='Lalitpur',
+                description='house ' * (i + 1),
+                on_sale=True,
+            )
+        HouseListing.objects.create(title='Flat', price=500_000, location='Kathmandu', on_sale=True)
+
+    def setUp(self):
+        if not fts_enabled():
+            self.skipTest("SQLite build without FTS5")
+
+    def test_cursor_pages_through_every_match(self):
+        seen = []
+        cursor = None
+        while True:
+            page = listing_page(HouseListing.objects.filter(on_sale=True), 'house', cursor, per_page=2)
+            seen.extend(listing.id for listing in page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        matches = HouseListing.objects.filter(title__icontains='house')
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(sorted(seen), sorted(matches.values_list('id', flat=True)))
+
+
+class VisitApprovalQueryCountTests(TestCase):
+    """Approving or rejecting visits costs the same number of queries however many are selected."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.house = HouseListing.objects.create(title='Bungalow', price=2_000_000, on_sale=True)
+
+    def _pending_visits(self, count):
+        first = User.objects.count()
+        users = [
+            User.objects.create_user(f"visitor{first + i}", email=f"visitor{first + i}@example.com")
+            for i in range(count)
+        ]
+        visits = ScheduleVisit.objects.bulk_create([
+            ScheduleVisit(house=self.house, user=user, visit_date=date(2026, 1, 1)) for user in users
+        ])
+        return ScheduleVisit.objects.filter(id__in=[visit.id for visit in visits])
+
+    def _assert_constant(self, action):
+        few, many = self._pending_visits(5), self._pending_visits(50)
+        with CaptureQueriesContext(connection) as baseline:
+            self.assertEqual(action(few), 5)
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            self.assertEqual(action(many), 50)
+        self.assertEqual(Notification.objects.count(), 55)
+
+    def test_approve_visits(self):
+        self._assert_constant(approve_visits)
+
+    def test_reject_visits(self):
+        self._assert_constant(reject_visits)
+
+    def test_admin_notification_wording(self):
+        reject_visits(self._pending_visits(1))
+        self.assertEqual(
+            Notification.objects.get().message, "❌ Your visit to 'Bungalow' was rejected. Reason: Rejected by admin."
+        )
+
+
+class NotificationAdminActionTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.user = User.objects.create_user('reader')
+        bulk_notify([(self.user, f"Message {i}", '/notifications/', 'system') for i in range(3)])
+        self.client.force_login(self.admin)
+
+    def test_mark_as_read_with_unread_filter_updates_counter(self):
+        self.assertEqual(UnreadCounter.objects.get(user=self.user).count, 3)
+        url = reverse('admin:HousePricePrediction_notification_changelist') + '?is_read__exact=0'
+        self.client.post(url, {
+            'action': 'mark_as_read',
+            '_selected_action': list(Notification.objects.values_list('id', flat=True)),
+        })
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertEqual(UnreadCounter.objects.get(user=self.user).count, 0)
+
+
+class NotificationStreamMarkerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('streamer')
+        self.marker_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.marker_dir.cleanup)
+        override = override_settings(NOTIFICATION_MARKER_DIR=self.marker_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _events(self, on_idle, count):
+        async def collect():
+            stream = events.notification_event_stream(self.user)
+            received = []
+            try:
+                async for chunk in stream:
+                    if chunk.startswith('retry'):
+                        continue
+                    received.append(chunk)
+                    if len(received) == 1:
+                        await sync_to_async(on_idle)()
+                    if len(received) == count:
+                        return received
+            finally:
+                await stream.aclose()
+        return async_to_sync(collect)()
+
+    def test_idle_stream_does_not_query(self):
+        with mock.patch.object(events, 'MARKER_POLL_INTERVAL', 0.01), \
+                mock.patch.object(events, 'HEARTBEAT_INTERVAL', 0.05), \
+                mock.patch.object(events, '_unread_state', wraps=events._unread_state) as state:
+            received = self._events(lambda: None, 2)
+        self.assertEqual(received[1], ': keep-alive\n\n')
+        self.assertEqual(state.call_count, 1)
+
+    def test_change_in_another_process_is_picked_up(self):
+        def change_elsewhere():
+            # No broker event, as when another worker process writes the rows
+            Notification.objects.create(user=self.user, message='From elsewhere')
+            reconcile_unread_counts([self.user.id])
+
+        with mock.patch.object(events, 'MARKER_POLL_INTERVAL', 0.01):
+            received = self._events(change_elsewhere, 2)
+        self.assertIn('"unread_count": 1', received[1])
+
+
+class LinearPredictorParityTests(SimpleTestCase):
+    """The compiled predictor must give sklearn's predictions for every linear candidate."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rng = np.random.default_rng(42)
+        scale = np.array([1_000_000, 20, 8, 4, 50_000, 3_000, 5_000, 5])
+        cls.X = rng.uniform(0.1, 1.0, size=(500, len(FEATURES))) * scale
+        weights = np.array([2.0, 15_000, 90_000, 40_000, 3.0, 900, 400, 60_000])
+        cls.y = cls.X @ weights + 250_000 + rng.normal(0, 100_000, size=500)
+        cls.test_rows = rng.uniform(0.1, 1.0, size=(50, len(FEATURES))) * scale
+
+    def _assert_parity(self, name):
+        model = training.CANDIDATES[name]().fit(self.X, self.y)
+        predictor = compile_linear(model, FEATURES)
+        self.assertIsNotNone(predictor)
+        expected = model.predict(self.test_rows)
+        np.testing.assert_allclose(predictor.predict_many(self.test_rows), expected, rtol=1e-9)
+        np.testing.assert_allclose(
+            [predictor.predict_one(row.tolist()) for row in self.test_rows], expected, rtol=1e-9
+        )
+        # And the same after a round trip through the JSON export
+        reloaded = LinearPredictor.from_dict(predictor.to_dict())
+        np.testing.assert_allclose(reloaded.predict_many(self.test_rows), expected, rtol=1e-9)
+
+    def test_linear_positive(self):
+        self._assert_parity('linear_positive')
+
+    def test_ridge_pipeline(self):
+        self._assert_parity('ridge')
+
+    def test_lasso_pipeline(self):
+        self._assert_parity('lasso')
+
+    def test_scaler_options_are_honoured(self):
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        for scaler in (StandardScaler(with_mean=False), StandardScaler(with_std=False)):
+            model = make_pipeline(scaler, Ridge(alpha=1.0)).fit(self.X, self.y)
+            predictor = compile_linear(model, FEATURES)
+            self.assertIsNotNone(predictor)
+            np.testing.assert_allclose(
+                predictor.predict_many(self.test_rows), model.predict(self.test_rows), rtol=1e-9
+            )
+
+    def test_other_pipeline_steps_are_not_compiled(self):
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import MinMaxScaler
+
+        model = make_pipeline(MinMaxScaler(), Ridge(alpha=1.0)).fit(self.X, self.y)
+        self.assertIsNone(compile_linear(model, FEATURES))
+        # Served by the pipeline itself instead
+        bounds = FeatureBounds.from_frame(pd.DataFrame(self.X, columns=FEATURES))
+        bundle = ModelBundle(model, bounds)
+        np.testing.assert_allclose(bundle.predict(self.test_rows), model.predict(self.test_rows), rtol=1e-12)
+
+    def test_non_linear_model_falls_back_to_estimator(self):
+        forest = training.CANDIDATES['random_forest']().fit(self.X[:100], self.y[:100])
+        self.assertIsNone(compile_linear(forest, FEATURES))
+        bundle = ModelBundle(forest, FeatureBounds.from_frame(pd.DataFrame(self.X, columns=FEATURES)))
+        self.assertIsNone(bundle.linear)
+        row = self.test_rows[0].tolist()
+        self.assertEqual(bundle.predict_one(row), forest.predict([row])[0])
+
+
+class BulkPredictionStreamTests(SimpleTestCase):
+    row = [600_000, 10, 6, 3, 20_000, 1_500, 2_000, 2]
+
+    def _predict(self, rows):
+        self.calls.append(len(rows))
+        valid = ~np.isnan(rows).any(axis=1)
+        return rows, valid, np.where(valid, 1.0, np.nan)
+
+    def setUp(self):
+        self.calls = []
+
+    def test_bad_json_value_is_a_row_error(self):
+        matrix = bulk.as_matrix([self.row, self.row[:7] + ['abc']])
+        results = json.loads(''.join(bulk.stream_json(bulk.predict_chunks(matrix, self._predict))))['results']
+        self.assertEqual(results[0]['price'], 1.0)
+        self.assertEqual(results[1], {'row': 1, 'error': "Please enter valid numbers"})
+
+    def test_wrong_width_is_still_rejected(self):
+        with self.assertRaises(bulk.BulkInputError):
+            bulk.as_matrix([self.row[:7]])
+
+    def test_predicts_one_chunk_at_a_time(self):
+        chunks = bulk.predict_chunks(np.array([self.row] * 5, dtype=float), self._predict, chunk_size=2)
+        stream = bulk.stream_csv(chunks)
+        next(stream)
+        self.assertEqual(self.calls, [2])
+        self.assertEqual(len(list(csv.reader(''.join(stream).splitlines()))), 3)
+        self.assertEqual(self.calls, [2, 2, 1])
+
+    def test_failure_after_first_chunk_ends_the_json(self):
+        def predict(rows):
+            if self.calls:
+                raise RuntimeError("model went away")
+            return self._predict(rows)
+
+        chunks = bulk.predict_chunks(np.array([self.row] * 3, dtype=float), predict, chunk_size=2)
+        payload = json.loads(''.join(bulk.stream_json(chunks)))
+        self.assertEqual(len(payload['results']), 2)
+        self.assertEqual(payload['error'], "Prediction failed from row 2")
+
+
+class InferenceConnectionTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'inference.sock')
+        self.server = InferenceServer(self.path, threads=2)
+        self.addCleanup(self.server.executor.shutdown)
+
+    def _start_server(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        listener = asyncio.run_coroutine_threadsafe(
+            asyncio.start_unix_server(self.server._serve_client, path=self.path), loop
+        ).result()
+
+        async def shutdown():
+            listener.close()
+            clients = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in clients:
+                task.cancel()
+            await asyncio.gather(*clients, return_exceptions=True)
+
+        def stop():
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        self.addCleanup(stop)
+
+    def test_stale_pooled_connection_is_retried(self):
+        self._start_server()
+        client = InferenceClient(self.path, pool_size=1)
+        self.addCleanup(client.close)
+        self.assertEqual(client.call('ping'), 'pong')
+
+        # As if the server had dropped the idle connection
+        sock = client._idle.get_nowait()
+        sock.shutdown(socket.SHUT_RDWR)
+        client._idle.put(sock)
+
+        self.assertEqual(client.call('ping'), 'pong')
+        self.assertEqual(client._open, 1)
+
+    def test_client_closing_mid_frame_is_dropped(self):
+        async def serve_truncated_frame():
+            reader = asyncio.StreamReader()
+            reader.feed_data(HEADER.pack(100) + b'{"op": ')
+            reader.feed_eof()
+            await self.server._serve_client(reader, writer)
+
+        writer = mock.Mock()
+        with self.assertLogs('HousePricePrediction.inference_server', 'WARNING'):
+            asyncio.run(serve_truncated_frame())
+        writer.close.assert_called_once()
@@ -0,0 +1,183 @@
+import logging
+import math
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Candidate estimators. Factories live at module level so worker processes can
+# look them up by name; sklearn is imported lazily inside each one.
+
+def linear_positive():
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression(positive=True)
+
+
+def ridge():
+    from sklearn.linear_model import RidgeCV
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    return make_pipeline(StandardScaler(), RidgeCV(alphas=np.logspace(-3, 3, 13)))
+
+
+def lasso():
+    from sklearn.linear_model import LassoCV
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    return make_pipeline(StandardScaler(), LassoCV(cv=3, max_iter=10000, random_state=42))
+
+
+def random_forest():
+    from sklearn.ensemble import RandomForestRegressor
+    # One core per fit: parallelism comes from running folds side by side
+    return RandomForestRegressor(n_estimators=200, min_samples_leaf=2, n_jobs=1, random_state=42)
+
+
+def gradient_boosting():
+    from sklearn.ensemble import GradientBoostingRegressor
+    return GradientBoostingRegressor(random_state=42)
+
+
+# Cheapest first, so a tight time budget still scores the fast models
+CANDIDATES = {
+    'linear_positive': linear_positive,
+    'ridge': ridge,
+    'lasso': lasso,
+    'random_forest': random_forest,
+    'gradient_boosting': gradient_boosting,
+}
+
+# The model train_model.py shipped before CV selection; used if nothing else finishes
+DEFAULT_MODEL = 'linear_positive'
+
+_X = None
+_y = None
+
+
+def _init_worker(X, y):
+    # Each worker gets the training matrix once instead of once per task
+    global _X, _y
+    _X, _y = X, y
+
+
+def _score(y_true, y_pred):
+    errors = y_pred - y_true
+    ss_res = float(np.sum(errors ** 2))
+    ss_tot = float(np.sum((y_true - y_true.mean()) ** 2))
+    return {
+        'rmse': math.sqrt(ss_res / len(y_true)),
+        'mae': float(np.mean(np.abs(errors))),
+        'r2': 1 - ss_res / ss_tot if ss_tot else 0.0,
+    }
+
+
+def _run_fold(name, fold, train_idx, test_idx):
+    started = time.perf_counter()
+    estimator = CANDIDATES[name]()
+    estimator.fit(_X[train_idx], _y[train_idx])
+    scores = _score(_y[test_idx], estimator.predict(_X[test_idx]))
+    return {'model': name, 'fold': fold, 'seconds': time.perf_counter() - started, **scores}
+
+
+def cross_validate(X, y, names=None, folds=5, n_jobs=None, budget=None, seed=42):
+    """Score every (candidate, fold) pair, spread over ``n_jobs`` processes.
+
+    Stops collecting once ``budget`` seconds have passed and kills whatever is
+    still running. Returns (fold results, timed out).
+    """
+    from sklearn.model_selection import KFold
+
+    X = np.ascontiguousarray(X, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    names = list(names or CANDIDATES)
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+    tasks = [(name, fold, train_idx, test_idx) for name in names for fold, (train_idx, test_idx) in enumerate(splits)]
+    if not n_jobs or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    deadline = time.monotonic() + budget if budget else None
+
+    results = []
+    timed_out = False
+    if n_jobs == 1:
+        _init_worker(X, y)
+        for task in tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                timed_out = True
+                break
+            try:
+                results.append(_run_fold(*task))
+            except Exception as e:
+                logger.error(f"{task[0]} fold {task[1]} failed: {str(e)}")
+        return results, timed_out
+
+    pool = multiprocessing.Pool(min(n_jobs, len(tasks)), initializer=_init_worker, initargs=(X, y))
+    try:
+        pending = [(task, pool.apply_async(_run_fold, task)) for task in tasks]
+        for task, async_result in pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                results.append(async_result.get(timeout=remaining))
+            except multiprocessing.TimeoutError:
+                timed_out = True
+                break
+            except Exception as e:
+                logger.error(f"{task[0]} fold {task[1]} failed: {str(e)}")
+
+        if timed_out:
+            # Keep folds that finished out of order before the deadline
+            collected = {(result['model'], result['fold']) for result in results}
+            for task, async_result in pending:
+                if (task[0], task[1]) not in collected and async_result.ready() and async_result.successful():
+                    results.append(async_result.get())
+    finally:
+        pool.terminate()
+        pool.join()
+    return results, timed_out
+
+
+def summarize(results, names, folds):
+    """Per-model CV summary, best mean RMSE first; models missing folds sort last."""
+    summary = []
+    for name in names:
+        rows = [row for row in results if row['model'] == name]
+        rmse = np.array([row['rmse'] for row in rows])
+        summary.append({
+            'model': name,
+            'folds': len(rows),
+            'complete': len(rows) == folds,
+            'rmse_mean': float(rmse.mean()) if rows else None,
+            'rmse_std': float(rmse.std()) if rows else None,
+            'mae_mean': float(np.mean([row['mae'] for row in rows])) if rows else None,
+            'r2_mean': float(np.mean([row['r2'] for row in rows])) if rows else None,
+            'fit_seconds': float(sum(row['seconds'] for row in rows)),
+        })
+    summary.sort(key=lambda row: (not row['complete'], row['rmse_mean'] if row['rmse_mean'] is not None else math.inf))
+    return summary
+
+
+def select_best(summary):
+    """Name of the complete candidate with the lowest CV RMSE, or DEFAULT_MODEL."""
+    for row in summary:
+        if row['complete']:
+            return row['model']
+    return DEFAULT_MODEL
+
+
+def format_report(summary, winner, folds):
+    lines = [
+        f"{'Model':<20} {'Folds':>7} {'CV RMSE':>16} {'± std':>14} {'MAE':>16} {'R²':>8} {'Fit s':>8}",
+    ]
+    for row in summary:
+        marker = ' *' if row['model'] == winner else ''
+        if row['rmse_mean'] is None:
+            lines.append(f"{row['model']:<20} {row['folds']:>3}/{folds:<3} {'(not finished)':>16}{marker}")
+            continue
+        lines.append(
+            f"{row['model']:<20} {row['folds']:>3}/{folds:<3} {row['rmse_mean']:>16,.0f} {row['rmse_std']:>14,.0f} "
+            f"{row['mae_mean']:>16,.0f} {row['r2_mean']:>8.4f} {row['fit_seconds']:>8.2f}{marker}"
+        )
+    return '\n'.join(lines)
@@ -18,11 +18,18 @@ urlpatterns = [
     # Prediction System
     path('predict/', views.predict, name='predict'),
     path('result/', views.result, name='result'),
+    path('api/predict/bulk/', views.bulk_predict, name='bulk_predict'),
+    path('api/predict/model/', views.model_coefficients, name='model_coefficients'),
+    path('api/predict/stats/', views.prediction_stats, name='prediction_stats'),
     path('heatmap/', views.show_heatmap, name='heatmap'),
+    path('heatmap/data/', views.heatmap_data, name='heatmap_data'),
+    path('heatmap/<str:version>.png', views.heatmap_image, name='heatmap_image'),
 
     # Property Listings
     path('listings/', views.listings_view, name='listings'),
+    path('api/listings/', views.listings_api, name='listings_api'),
     path('listings/<int:pk>/', views.house_detail, name='house_detail'),
+    path('listings/<int:pk>/image/<str:version>/<int:width>.<str:fmt>', views.listing_image, name='listing_image'),
     path('listings/<int:pk>/mark/', views.mark_for_sale, name='mark_for_sale'),
 
     # Visit Scheduling (Only creation by user; no cancellation by user)
@@ -33,6 +40,7 @@ urlpatterns = [
     path('notifications/mark-read/<int:notification_id>/', views.mark_notification_read, name='mark_notification_read'),
     path('notifications/clear/', views.clear_notifications, name='clear_notifications'),
     path('check-notifications/', views.check_notifications, name='check_notifications'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
 
     # Admin Visit Approvals
     path('admin/visit-approvals/', views.admin_visit_approvals, name='admin_visit_approvals'),
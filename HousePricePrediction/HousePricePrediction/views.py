@@ -6,40 +6,33 @@ from django.contrib import messages
 from django.contrib.messages import get_messages
 from django.conf import settings
 from .models import HouseListing, ScheduleVisit, Notification
-from django.http import JsonResponse, HttpResponse
-from django.core.mail import send_mail
+from . import inference
+from .inference import MIN_INCOME, InferenceUnavailable
+from .heatmap import render_heatmap, correlation_payload
+from .notifications import (
+    create_notification, notify_users, unread_count, mark_read, mark_all_read, clear_all
+)
+from .events import notification_event_stream
+from .visits import approve_visits, reject_visits
+from .listings import (
+    PAGE_SIZE, SORT_LABELS, ListingFilterError, listing_page, parse_filters, facet_counts, serialize_listing
+)
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse, Http404
+from django.urls import reverse
+from django.core.handlers.asgi import ASGIRequest
+from django.views.decorators.http import require_POST
 from django.db.models import Q
 from django.contrib.auth.models import User
 from datetime import datetime, timedelta
 from django.db import transaction
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-import pandas as pd
-import joblib
+import itertools
 import logging
 import os
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Load model
-try:
-    model = joblib.load('my_new_model.pkl')
-except Exception as e:
-    logger.error(f"Error loading model: {str(e)}")
-    model = None
-
-# Load dataset
-try:
-    housing_data = pd.read_excel(r'C:\Users\Asus\OneDrive\Desktop\kathmandu\HousePricePrediction\HousePricePrediction\kathmandudataset.xlsx')
-except Exception as e:
-    logger.error(f"Error loading dataset: {str(e)}")
-    housing_data = None
-
 def load_evaluation_metrics():
     try:
         metrics_path = os.path.join(settings.BASE_DIR, 'model_evaluation.txt')
@@ -54,27 +47,6 @@ def load_evaluation_metrics():
         logger.error(f"Error loading evaluation metrics: {str(e)}")
         return None
 
-# Notification utilities
-def create_notification(user, message, link='', notification_type='info'):
-    Notification.objects.create(
-        user=user,
-        message=message,
-        link=link,
-        notification_type=notification_type
-    )
-    logger.info(f"Notification created for user {user.username}: {message}")
-    if notification_type in ['alert', 'important']:
-        try:
-            send_mail(
-                'New Notification',
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=True,
-            )
-        except Exception as e:
-            logger.error(f"Failed to send email notification: {str(e)}")
-
 # Core pages
 def home(request):
     return render(request, 'home.html')
@@ -108,9 +80,9 @@ def login_view(request):
 
         if user:
             login(request, user)
-            unread_count = Notification.objects.filter(user=user, is_read=False).count()
-            if unread_count > 0:
-                messages.info(request, f"You have {unread_count} unread notifications")
+            unread = unread_count(user)
+            if unread > 0:
+                messages.info(request, f"You have {unread} unread notifications")
             return redirect(request.GET.get('next', 'home'))
         else:
             return render(request, 'registration/login.html', {'form': {}, 'login_page': True})
@@ -154,16 +126,11 @@ def predict(request):
 
 @login_required(login_url='login')
 def result(request):
-    if not model or housing_data is None:
-        messages.error(request, "Prediction system not available")
-        return redirect('home')
-
     try:
-        # Now expecting 7 inputs
+        # Now expecting 8 inputs
         inputs = [float(request.GET.get(f'n{i}', 0)) for i in range(1, 9)]
 
         # Enforce minimum value for Avg. Area Income (first input)
-        MIN_INCOME = 75000
         if inputs[0] < MIN_INCOME:
             messages.warning(request, f"Average area income must be at least NPR {MIN_INCOME:,}")
             return redirect('predict')
@@ -172,80 +139,28 @@ def result(request):
             messages.warning(request, "Only positive numbers are allowed")
             return redirect('predict')
 
+        output = inference.predict_one(inputs)
+        prediction = output['prediction']
+        logger.info(f"Prediction inputs: {output['inputs']}, output: {prediction}")
 
-        # Clamp inputs to training min/max
-        for i, col in enumerate([
-            'Avg. Area Income', 'Avg. Area House Age',
-            'Avg. Area Number of Rooms', 'Avg. Area Number of Bedrooms',
-            'Area Population', 'Build-up Area', 'Land Area', 'Floor'
-        ]):
-            min_val = housing_data[col].min()
-            max_val = housing_data[col].max()
-            if inputs[i] < min_val:
-                inputs[i] = min_val
-            elif inputs[i] > max_val:
-                inputs[i] = max_val
-
-        inputs[7] = int(round(inputs[7])) 
-
-        raw_pred = model.predict([inputs])[0]
-        prediction = max(0, round(raw_pred, 2))  # Clamp to zero
-        logger.info(f"Prediction inputs: {inputs}, output: {prediction}")
-
-        df = housing_data.copy()
-        df['distance'] = np.sqrt(
-            (df['Avg. Area Income'] - inputs[0]) ** 2 +
-            (df['Avg. Area House Age'] - inputs[1]) ** 2 +
-            (df['Avg. Area Number of Rooms'] - inputs[2]) ** 2 +
-            (df['Avg. Area Number of Bedrooms'] - inputs[3]) ** 2 +
-            (df['Area Population'] - inputs[4]) ** 2 +
-            (df['Build-up Area'] - inputs[5]) ** 2 +         
-            (df['Land Area'] - inputs[6]) ** 2 +               
-            (df['Floor'] - inputs[7]) ** 2
-        )
-        closest_row = df.loc[df['distance'].idxmin()]
-        address = closest_row['Address']
-
-        lower_bound = prediction * 0.9
-        upper_bound = prediction * 1.1
-
-        similar_rows = df[(df['Price'] >= lower_bound) & (df['Price'] <= upper_bound)].sort_values('distance').head(5)
-
-        similar_predictions = []
-        for _, row in similar_rows.iterrows():
-            similar_predictions.append({
-                'price': f"Npr {row['Price']:,.2f}",
-                'address': row['Address'],
-                'bedrooms': row['Avg. Area Number of Bedrooms'],
-                'rooms': row['Avg. Area Number of Rooms'],
-                'population': row['Area Population'],
-                'buildup_area': row['Build-up Area'],    
-                'land_area': row['Land Area'],          
-            })
-
-        # Example: Find houses with the same number of rooms, bedrooms, and house age
-        rooms = inputs[2]
-        bedrooms = inputs[3]
-        house_age = inputs[1]
-
-        matches = housing_data[
-            (housing_data['Avg. Area Number of Rooms'] == rooms) &
-            (housing_data['Avg. Area Number of Bedrooms'] == bedrooms) &
-            (housing_data['Avg. Area House Age'] == house_age)
+        similar_predictions = [
+            dict(item, price=f"Npr {item['price']:,.2f}") for item in output['similar']
         ]
 
-        print(matches[['Avg. Area Number of Rooms', 'Avg. Area Number of Bedrooms', 'Avg. Area House Age', 'Price']])
-
-        metrics = load_evaluation_metrics()
+        metrics = output['metrics'] or load_evaluation_metrics()
 
         return render(request, 'predict.html', {
             'result': f"Npr {prediction:,.2f}",
-            'inputs': inputs,
-            'address': address,
+            'inputs': output['inputs'],
+            'address': output['address'],
             'metrics': metrics,
             'similar_predictions': similar_predictions
         })
 
+    except InferenceUnavailable:
+        messages.error(request, "Prediction system not available")
+        return redirect('home')
+
     except ValueError:
         messages.error(request, "Please enter valid numbers")
         return redirect('predict')
@@ -256,46 +171,171 @@ def result(request):
         return redirect('predict')
 
 
-# Heatmap
 @login_required(login_url='login')
-def show_heatmap(request):
+@require_POST
+def bulk_predict(request):
+    # Imported here so workers that never serve the bulk API skip NumPy/pandas
+    from .bulk import BulkInputError, parse_bulk_request, predict_chunks, stream_json, stream_csv
+
     try:
-        df = housing_data.copy()
-        corr = df.corr(numeric_only=True)
+        matrix, fmt = parse_bulk_request(request)
+    except BulkInputError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(corr, annot=True, cmap='coolwarm', fmt='.2f')
-        plt.title('Feature Correlation Heatmap')
+    # Rows are predicted a chunk at a time as the response streams. The first
+    # chunk is predicted up front so an unavailable model is still a 503.
+    chunks = predict_chunks(matrix, inference.predict_many)
+    try:
+        first = next(chunks, None)
+    except InferenceUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=503)
+    except Exception as e:
+        logger.error(f"Bulk prediction error: {str(e)}")
+        return JsonResponse({'error': 'Prediction failed'}, status=500)
+    if first is not None:
+        chunks = itertools.chain([first], chunks)
 
-        heatmap_path = os.path.join(settings.BASE_DIR, 'static', 'heatmap.png')
-        plt.savefig(heatmap_path)
-        plt.close()
+    if fmt == 'csv':
+        response = StreamingHttpResponse(stream_csv(chunks), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="predictions.csv"'
+        return response
+    return StreamingHttpResponse(stream_json(chunks), content_type='application/json')
 
-        return render(request, 'heatmap.html', {'heatmap_url': '/static/heatmap.png'})
+
+@login_required(login_url='login')
+def model_coefficients(request):
+    """Linear coefficients and clamp bounds for the live estimate on the predict form."""
+    try:
+        export = inference.linear_export()
+    except InferenceUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=503)
+    except Exception as e:
+        logger.error(f"Model export error: {str(e)}")
+        return JsonResponse({'error': 'Model not available'}, status=503)
+    if export is None:
+        # Non-linear models have no closed form to ship; the form falls back to /result/
+        return JsonResponse({'error': 'The current model cannot be evaluated in the browser'}, status=404)
+
+    etag = '"%s"' % export['model_version']
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse(export)
+    response['ETag'] = etag
+    # Short max-age: a hot-reloaded bundle is picked up within minutes
+    response['Cache-Control'] = 'private, max-age=300'
+    return response
+
+@login_required(login_url='login')
+@user_passes_test(lambda u: u.is_staff)
+def prediction_stats(request):
+    return JsonResponse(inference.stats())
+
+
+# Heatmap
+@login_required(login_url='login')
+def show_heatmap(request):
+    try:
+        housing_data, dataset_version = inference.get_dataset()
+        render_heatmap(housing_data, dataset_version, settings.HEATMAP_CACHE_DIR)
+        heatmap_url = reverse('heatmap_image', args=[dataset_version])
+        return render(request, 'heatmap.html', {'heatmap_url': heatmap_url})
 
     except Exception as e:
         logger.error(f"Heatmap generation failed: {str(e)}")
         messages.error(request, "Unable to generate heatmap.")
         return redirect('predict')
 
+@login_required(login_url='login')
+def heatmap_image(request, version):
+    housing_data, dataset_version = inference.get_dataset()
+    if housing_data is None or version != dataset_version:
+        raise Http404("Unknown heatmap version")
+    path = render_heatmap(housing_data, dataset_version, settings.HEATMAP_CACHE_DIR)
+    response = FileResponse(open(path, 'rb'), content_type='image/png')
+    # URL changes with the dataset, so the image never needs revalidating
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+@login_required(login_url='login')
+def heatmap_data(request):
+    housing_data, dataset_version = inference.get_dataset()
+    if housing_data is None:
+        return JsonResponse({'error': 'Dataset not available'}, status=503)
+    etag = f'"{dataset_version}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse(correlation_payload(housing_data, dataset_version))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
+
 # Listings
 @login_required(login_url='login')
 def listings_view(request):
-    query = request.GET.get('q', '')
-    listings = HouseListing.objects.filter(on_sale=True)
-    
-    if query:
-        listings = listings.filter(
-            Q(title__icontains=query) |
-            Q(location__icontains=query) |
-            Q(description__icontains=query)
-        )
-    
+    query = request.GET.get('q', '').strip()
+    cursor = request.GET.get('after')
+    try:
+        filters = parse_filters(request.GET)
+    except ListingFilterError as e:
+        messages.error(request, str(e))
+        filters = {}
+
+    on_sale = HouseListing.objects.filter(on_sale=True)
+    page = listing_page(on_sale, query=query, cursor=cursor, filters=filters)
+    # Current search and filters, for the pagination links
+    params = request.GET.copy()
+    params.pop('after', None)
+
     return render(request, 'listings.html', {
-        'listings': listings,
-        'search_query': query
+        'listings': page.items,
+        'search_query': query,
+        'filters': filters,
+        'facets': facet_counts(on_sale, filters, query),
+        'sorts': [(name, label) for name, label in SORT_LABELS.items() if query or name != 'relevance'],
+        'page_params': params.urlencode(),
+        'next_cursor': page.next_cursor,
+        'is_first_page': not cursor,
+    })
+
+
+@login_required(login_url='login')
+def listings_api(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        filters = parse_filters(request.GET)
+        per_page = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), 100)
+    except (ListingFilterError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    on_sale = HouseListing.objects.filter(on_sale=True)
+    page = listing_page(on_sale, query=query, cursor=request.GET.get('after'), per_page=per_page, filters=filters)
+    return JsonResponse({
+        'results': [serialize_listing(listing) for listing in page.items],
+        'next_cursor': page.next_cursor,
+        'facets': facet_counts(on_sale, filters, query),
+        'filters': filters,
     })
 
+@login_required(login_url='login')
+def listing_image(request, pk, version, width, fmt):
+    # Imported here so only requests for images load Pillow
+    from .images import WIDTHS, FORMATS, image_version, render_derivative
+
+    house = get_object_or_404(HouseListing, pk=pk)
+    if width not in WIDTHS or fmt not in FORMATS or version != image_version(house):
+        raise Http404("Unknown image")
+    try:
+        path = render_derivative(house, width, fmt)
+    except Exception as e:
+        logger.error(f"Error rendering image for listing {pk}: {str(e)}")
+        raise Http404("Image unavailable")
+    response = FileResponse(open(path, 'rb'), content_type=FORMATS[fmt][1])
+    # URL changes with the uploaded file, so the image never needs revalidating
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
 @login_required
 def mark_for_sale(request, pk):
     house = get_object_or_404(HouseListing, pk=pk)
@@ -369,18 +409,14 @@ def schedule_visit(request, house_id):
                     status='pending'
                 )
 
-              # Notify admins
-            admin_users = User.objects.filter(is_staff=True)
+            # Notify admins in one bulk insert; their emails go out in the background
             admin_message = f"New visit request for {house.title} from {request.user.username}"
-
-            for admin in admin_users:
-                create_notification(
-                    user=admin,
-                    message=admin_message,
-                    link=f'/admin/HousePricePrediction/schedulevisit/{visit.id}/change/',
-                    notification_type='alert'
-                )
-
+            notify_users(
+                User.objects.filter(is_staff=True),
+                message=admin_message,
+                link=f'/admin/HousePricePrediction/schedulevisit/{visit.id}/change/',
+                notification_type='alert'
+            )
 
             # Notify the user with a friendly link
             create_notification(
@@ -434,16 +470,11 @@ def approve_visit(request, visit_id):
         visit = get_object_or_404(ScheduleVisit, id=visit_id)
         admin_notes = request.POST.get('admin_notes', '')
 
-        visit.status = 'approved'
-        visit.admin_notes = admin_notes
-        visit.save()
-
-        message = f"Your visit to {visit.house.title} on {visit.visit_date} at {visit.visit_time} was approved!"
-        create_notification(
-            user=visit.user,
-            message=message,
-            link='/notifications/',
-            notification_type='success'
+        approve_visits(
+            ScheduleVisit.objects.filter(id=visit.id), admin_notes=admin_notes, pending_only=False,
+            message_for=lambda visit: (
+                f"Your visit to {visit.house.title} on {visit.visit_date} at {visit.visit_time} was approved!"
+            ),
         )
 
         messages.success(request, "Visit approved and notification sent.")
@@ -457,16 +488,9 @@ def reject_visit(request, visit_id):
         visit = get_object_or_404(ScheduleVisit, id=visit_id)
         admin_notes = request.POST.get('admin_notes', '')
 
-        visit.status = 'rejected'
-        visit.admin_notes = admin_notes
-        visit.save()
-
-        message = f"Your visit to {visit.house.title} was rejected. Reason: {admin_notes}"
-        create_notification(
-            user=visit.user,
-            message=message,
-            link='/notifications/',  # better fallback for users
-            notification_type='alert'
+        reject_visits(
+            ScheduleVisit.objects.filter(id=visit.id), admin_notes=admin_notes, pending_only=False,
+            message_for=lambda visit: f"Your visit to {visit.house.title} was rejected. Reason: {visit.admin_notes}",
         )
 
         messages.success(request, "Visit rejected and notification sent.")
@@ -477,7 +501,7 @@ def reject_visit(request, visit_id):
 @login_required
 def notifications_view(request):
     notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    mark_all_read(request.user)
     return render(request, 'notification_list.html', {
         'notifications': notifications,
         'now': datetime.now()
@@ -486,15 +510,14 @@ def notifications_view(request):
 @login_required
 def mark_notification_read(request, notification_id):
     notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
+    mark_read(notification)
     return redirect(notification.link) if notification.link else redirect('notifications')
 
 @login_required
 def clear_notifications(request):
     if request.method == 'POST':
         # Delete all notifications for the user
-        Notification.objects.filter(user=request.user).delete()
+        clear_all(request.user)
 
         # Create a new notification for the user only
         create_notification(
@@ -535,11 +558,6 @@ def check_visit_status(request, house_id):
 @login_required
 def check_notifications(request):
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-        
         recent_notifications = Notification.objects.filter(
             user=request.user
         ).order_by('-created_at')[:5]
@@ -552,7 +570,21 @@ def check_notifications(request):
         } for n in recent_notifications]
         
         return JsonResponse({
-            'unread_count': unread_count,
+            'unread_count': unread_count(request.user),
             'notifications': notifications_data
         })
-    return JsonResponse({})
\ No newline at end of file
+    return JsonResponse({})
+
+# Push channel: Server-Sent Events over the ASGI application; check_notifications stays as the polling fallback
+async def notification_stream(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be tied up for the life of the stream; 204 tells EventSource to stop
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(notification_event_stream(user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
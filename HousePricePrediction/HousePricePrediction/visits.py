@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ScheduleVisit
+from .notifications import bulk_notify
+
+DEFAULT_REJECTION_REASON = "Rejected by admin."
+
+
+def _update_visits(queryset, status, admin_notes, pending_only, message_for, notification_type):
+    """Set-based status change shared by the admin actions and the approval views.
+
+    One SELECT (with house and user joined), one bulk UPDATE and one bulk INSERT
+    of notifications, all in a single transaction.
+    """
+    with transaction.atomic():
+        if pending_only:
+            queryset = queryset.filter(status='pending')
+        visits = list(queryset.select_related('house', 'user').select_for_update())
+        if not visits:
+            return 0
+
+        now = timezone.now()
+        for visit in visits:
+            visit.status = status
+            visit.admin_notes = admin_notes(visit)
+            visit.notified = True
+            visit.updated_at = now
+        ScheduleVisit.objects.bulk_update(visits, ['status', 'admin_notes', 'notified', 'updated_at'])
+
+        bulk_notify(
+            (visit.user, message_for(visit), '/notifications/', notification_type)
+            for visit in visits
+        )
+    return len(visits)
+
+
+def approval_message(visit):
+    return f"✅ Your visit to '{visit.house.title}' on {visit.visit_date} at {visit.visit_time} has been approved!"
+
+
+def rejection_message(visit):
+    return f"❌ Your visit to '{visit.house.title}' was rejected. Reason: {visit.admin_notes}"
+
+
+def approve_visits(queryset, admin_notes=None, pending_only=True, message_for=approval_message):
+    return _update_visits(
+        queryset, 'approved',
+        admin_notes=lambda visit: visit.admin_notes if admin_notes is None else admin_notes,
+        pending_only=pending_only,
+        message_for=message_for,
+        notification_type='success',
+    )
+
+
+def reject_visits(queryset, admin_notes=None, pending_only=True, message_for=rejection_message):
+    return _update_visits(
+        queryset, 'rejected',
+        admin_notes=lambda visit: (
+            admin_notes if admin_notes is not None else visit.admin_notes or DEFAULT_REJECTION_REASON
+        ),
+        pending_only=pending_only,
+        message_for=message_for,
+        notification_type='alert',
+    )
@@ -8,136 +8,278 @@ from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 import joblib
 from matplotlib.ticker import FuncFormatter
 
-# 1. Load and Prepare the Dataset
-def load_and_prepare_data(filepath):
-    # Check file extension to determine how to read it
-    if filepath.endswith('.csv'):
-        data = pd.read_csv(filepath)
-    elif filepath.endswith('.xlsx'):
-        data = pd.read_excel(filepath)
-    else:
-        raise ValueError("Unsupported file format. Please provide a .csv or .xlsx file.")
-
-    # Strip whitespace from column names to avoid KeyError
-    data.columns = data.columns.str.strip()
-
-    # Ensure prices and features are non-negative integers
-    data['Price'] = data['Price'].fillna(0).round().astype(int)
-
-    features = [
-        'Avg. Area Income', 'Avg. Area House Age',
-        'Avg. Area Number of Rooms',
-        'Avg. Area Number of Bedrooms',
-        'Area Population',
-        'Build-up Area',
-        'Land Area',
-        'Floor'                # <-- Add this line
-    ]
-    # Fill missing values in features with 0 before rounding/converting
-    data[features] = data[features].fillna(0).round().astype(int)
+from dotenv import load_dotenv
 
-    # Drop rows with negative values (if any)
-    data = data[(data[features] >= 0).all(axis=1)]
-    data = data[data['Price'] >= 0]
+import argparse
+import hashlib
+import json
+import os
+import time
 
-    return data, features
-# Update the file path to use forward slashes or raw string
-filepath = r'C:\Users\Asus\OneDrive\Desktop\kathmandu\HousePricePrediction\HousePricePrediction\kathmandudataset.xlsx'
-data, features = load_and_prepare_data(filepath)
-
-# Rest of your code remains the same...
-# 2. Split Features and Target
-X = data[features]
-y = data['Price']
-
-# 3. Train-Test Split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.3, random_state=42
+from HousePricePrediction.features import FEATURES, FeatureBounds, bounds_path, clean_rows
+from HousePricePrediction.model_bundle import save_bundle
+from HousePricePrediction.dataset import load_dataset
+from HousePricePrediction.heatmap import default_cache_dir as heatmap_cache_dir, render_heatmap
+from HousePricePrediction.streaming import (
+    DEFAULT_CHUNKSIZE, LeastSquaresStats, fit_streaming, iter_chunks, stats_path
 )
+from HousePricePrediction.training import CANDIDATES, cross_validate, summarize, select_best, format_report
 
-# Print min and max for each feature in training data
-print("\nFeature min/max values in training data:")
-for col in X_train.columns:
-    print(f"{col}: min={X_train[col].min()}, max={X_train[col].max()}")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_PATH = os.path.join(BASE_DIR, 'house_price_bundle.joblib')
+REPORT_PATH = os.path.join(BASE_DIR, 'model_comparison.json')
+# Bare pickle the web app falls back to when no bundle exists (inference.get_model_store)
+LEGACY_MODEL_PATH = os.path.join(BASE_DIR, 'my_new_model.pkl')
 
-# 4. Train the Model with Non-Negative Constraints
-model = LinearRegression(positive=True)  # Critical: Force coefficients ≥ 0
-model.fit(X_train, y_train)
+# 1. Load and Prepare the Dataset
+def load_and_prepare_data(filepath):
+    # Read through the shared columnar cache (column names come back stripped)
+    data, version = load_dataset(filepath)
+    # Pre-render the correlation heatmap so the first /heatmap/ view is a cache hit
+    render_heatmap(data, version, heatmap_cache_dir())
+
+    features = list(FEATURES)
+    data = clean_rows(data, features)
+
+    return data, features
 
-# Save model
-joblib.dump(model, 'my_new_model.pkl')
-print("✅ Model trained and saved successfully!")
 
 # 5. Predict with Safeguards
-def predict_price(model, input_data):
+def predict_price(model, input_data, bounds, features):
     """Ensure predictions are non-negative and handle edge cases."""
     if isinstance(input_data, (list, np.ndarray)):
         input_data = pd.DataFrame([input_data], columns=features)
 
     # Clamp inputs to training min/max
-    for i, col in enumerate([
-        'Avg. Area Income', 'Avg. Area House Age',
-        'Avg. Area Number of Rooms', 'Avg. Area Number of Bedrooms',
-        'Area Population', 'Build-up Area', 'Land Area', 'Floor'
-    ]):
-        min_val = X_train[col].min()
-        max_val = X_train[col].max()
-        if input_data[col] < min_val:
-            input_data[col] = min_val
-        elif input_data[col] > max_val:
-            input_data[col] = max_val
-
-    # Validate input ranges (warn if outside training data)
-    for col in features:
-        if (input_data[col].min() < X_train[col].min() or 
-            input_data[col].max() > X_train[col].max()):
-            print(f"⚠️ Warning: Input '{col}' is outside training range!")
+    out_of_range = [
+        col for col, low, high in zip(features, bounds.lows, bounds.highs)
+        if input_data[col].min() < low or input_data[col].max() > high
+    ]
+    for col in out_of_range:
+        print(f"⚠️ Warning: Input '{col}' is outside training range!")
+    input_data = pd.DataFrame(
+        bounds.clip(input_data[features].to_numpy()),
+        columns=features, index=input_data.index
+    )
 
     y_pred = model.predict(input_data)
     y_pred = np.round(np.maximum(y_pred, 0)).astype(int)  # Force ≥ 0 and integer
     return y_pred
 
-# 6. Evaluate on Test Set
-y_pred = predict_price(model, X_test)
-
-# Sample predictions
-preview = pd.DataFrame({
-    'Actual Price (NPR)': y_test.values,
-    'Predicted Price (NPR)': y_pred,
-    'Error (NPR)': abs(y_test.values - y_pred)
-})
-print("\n🔍 Sample Predictions:")
-print(preview.head())
-
-# 7. Evaluation Metrics
-r2 = r2_score(y_test, y_pred)
-mae = mean_absolute_error(y_test, y_pred)
-mse = mean_squared_error(y_test, y_pred)
-rmse = np.sqrt(mse)
-
-print("\n📊 Evaluation Metrics:")
-print(f"R² Score: {r2:.4f}")
-print(f"Mean Absolute Error: NPR {mae:,.0f}")
-print(f"Mean Squared Error: NPR {mse:,.0f}")
-print(f"Root Mean Squared Error: NPR {rmse:,.0f}")
-
-# 8. Visualization
-plt.figure(figsize=(10, 6))
-plt.scatter(y_test, y_pred, alpha=0.6, color='green', label='Predictions')
-plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 
-         'r--', label='Perfect Prediction')
-plt.xlabel('Actual Price (NPR)')
-plt.ylabel('Predicted Price (NPR)')
-plt.title('Actual vs Predicted House Prices (NPR)')
-plt.legend()
-plt.grid(True)
-
-# Format axes as NPR
-plt.ticklabel_format(style='plain', axis='both')
-plt.gca().get_xaxis().set_major_formatter(
-    FuncFormatter(lambda x, _: f'NPR {x:,.0f}'))
-plt.gca().get_yaxis().set_major_formatter(
-    FuncFormatter(lambda y, _: f'NPR {y:,.0f}'))
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+
+def save_base_stats(model, X_train, y_train, features):
+    """Base statistics for `manage.py update_model`, which can only extend a positive linear fit."""
+    path = stats_path(BUNDLE_PATH)
+    if isinstance(model, LinearRegression) and model.positive:
+        LeastSquaresStats.from_rows(X_train.to_numpy(), y_train.to_numpy(), features).save(path)
+        return
+    if os.path.exists(path):
+        # They describe an earlier model; update_model must not fold listings into those
+        os.remove(path)
+    print("ℹ️ Selected model is not a positive linear regression; incremental updates are unavailable "
+          "(train with --incremental to keep one)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train and publish the house price model")
+    parser.add_argument('--data', default=os.path.join(BASE_DIR, 'kathmandudataset.xlsx'))
+    parser.add_argument('--models', nargs='+', choices=list(CANDIDATES), default=list(CANDIDATES),
+                        help="Candidate models to cross-validate")
+    parser.add_argument('--folds', type=int, default=5, help="k for k-fold cross-validation")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Worker processes (-1 for all cores)")
+    parser.add_argument('--budget', type=float, default=300,
+                        help="Wall-clock seconds for cross-validation (0 for no limit)")
+    parser.add_argument('--no-plot', action='store_true', help="Skip the actual vs predicted plot")
+    parser.add_argument('--incremental', action='store_true',
+                        default=os.getenv('INCREMENTAL_MODEL_UPDATES', 'False').lower() == 'true',
+                        help="Publish the positive linear model even if CV prefers another, so "
+                             "`manage.py update_model` can keep extending it (default: $INCREMENTAL_MODEL_UPDATES)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Fit the positive linear model in one chunked pass over --data (CSV, Parquet or xlsx)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk with --stream")
+    parser.add_argument('--check', action='store_true',
+                        help="With --stream, also fit sklearn in memory and compare (small datasets only)")
+    return parser.parse_args()
+
+
+def train_streaming(args):
+    """Out-of-core fit: memory stays constant however many rows --data has.
+
+    Trains on every row (there is no holdout split in a single pass), so the
+    metrics are in-sample.
+    """
+    started = time.monotonic()
+    model, bounds, stats = fit_streaming(args.data, chunksize=args.chunksize)
+    rss = stats.residual_sum_of_squares(model.coef_)
+    mse = rss / stats.n
+    r2 = 1 - rss / stats.yty if stats.yty else 0.0
+    print(f"\n🌊 Streamed {stats.n:,} rows in {time.monotonic() - started:.1f}s")
+    for col, coef in zip(stats.features, model.coef_):
+        print(f"{col}: {coef:.6f}")
+    print(f"Intercept: {model.intercept_:.6f}")
+    print(f"R² Score (in-sample): {r2:.4f}")
+    print(f"Root Mean Squared Error (in-sample): NPR {np.sqrt(mse):,.0f}")
+
+    if args.check:
+        data = clean_rows(pd.concat(iter_chunks(args.data, args.chunksize), ignore_index=True))
+        reference = LinearRegression(positive=True).fit(data[stats.features], data['Price'])
+        coef_diff = np.max(np.abs(reference.coef_ - model.coef_) / np.maximum(np.abs(reference.coef_), 1.0))
+        pred_diff = np.max(np.abs(
+            reference.predict(data[stats.features]) - model.predict(data[stats.features])
+        ) / np.maximum(np.abs(data['Price'].to_numpy()), 1.0))
+        print(f"🔎 Max relative difference vs in-memory fit: coef {coef_diff:.2e}, predictions {pred_diff:.2e}")
+
+    joblib.dump(model, LEGACY_MODEL_PATH)
+    bounds.save(bounds_path(LEGACY_MODEL_PATH))
+    # Base statistics for `manage.py update_model` to fold new listings into
+    stats.save(stats_path(BUNDLE_PATH))
+    data_hash = hashlib.sha256(json.dumps(stats.to_dict(), sort_keys=True).encode()).hexdigest()
+    version = save_bundle(
+        BUNDLE_PATH, model, bounds,
+        metrics={'r2': float(r2), 'mse': float(mse), 'rmse': float(np.sqrt(mse)), 'model': 'linear_positive'},
+        data_hash=data_hash,
+    )
+    print(f"📦 Model bundle {version} written to {BUNDLE_PATH}")
+
+
+def main():
+    # Same .env as the web app, so cache directory overrides apply here too
+    load_dotenv(os.path.join(BASE_DIR, '.env'))
+    args = parse_args()
+    if args.stream:
+        return train_streaming(args)
+
+    data, features = load_and_prepare_data(args.data)
+
+    # 2. Split Features and Target
+    X = data[features]
+    y = data['Price']
+
+    # 3. Train-Test Split
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.3, random_state=42
+    )
+
+    # Print min and max for each feature in training data
+    print("\nFeature min/max values in training data:")
+    for col in X_train.columns:
+        print(f"{col}: min={X_train[col].min()}, max={X_train[col].max()}")
+
+    # 4. Pick the model by k-fold CV RMSE on the training split, folds run in parallel
+    if args.incremental and 'linear_positive' not in args.models:
+        args.models.append('linear_positive')
+    started = time.monotonic()
+    results, timed_out = cross_validate(
+        X_train.to_numpy(), y_train.to_numpy(), names=args.models,
+        folds=args.folds, n_jobs=args.n_jobs, budget=args.budget or None,
+    )
+    summary = summarize(results, args.models, args.folds)
+    winner = select_best(summary)
+    cv_seconds = time.monotonic() - started
+
+    print(f"\n🏁 Cross-validation ({args.folds} folds, {cv_seconds:.1f}s):")
+    print(format_report(summary, winner, args.folds))
+    if timed_out:
+        print(f"⏱️ Budget of {args.budget:.0f}s reached; unfinished models were not eligible")
+    print(f"Selected model: {winner}")
+
+    published = winner
+    if args.incremental and winner != 'linear_positive':
+        # update_model can only extend a positive linear fit
+        published = 'linear_positive'
+        rmse = {row['model']: row['rmse_mean'] for row in summary}
+        if rmse['linear_positive'] is not None and rmse.get(winner) is not None:
+            print(f"⚠️ --incremental: publishing linear_positive instead, CV RMSE NPR "
+                  f"{rmse['linear_positive'] - rmse[winner]:,.0f} worse than {winner}")
+        else:
+            print(f"⚠️ --incremental: publishing linear_positive instead of {winner}, "
+                  "without a CV comparison")
+
+    with open(REPORT_PATH, 'w') as f:
+        json.dump({
+            'winner': winner,
+            'published': published,
+            'folds': args.folds,
+            'n_jobs': args.n_jobs,
+            'budget_seconds': args.budget,
+            'timed_out': timed_out,
+            'seconds': cv_seconds,
+            'models': summary,
+            'fold_results': results,
+        }, f, indent=2)
+
+    model = CANDIDATES[published]()
+    model.fit(X_train, y_train)
+
+    # Save model, with the training clamp bounds next to it
+    bounds = FeatureBounds.from_frame(X_train, features)
+    joblib.dump(model, LEGACY_MODEL_PATH)
+    bounds.save(bounds_path(LEGACY_MODEL_PATH))
+    save_base_stats(model, X_train, y_train, features)
+    print("✅ Model trained and saved successfully!")
+
+    # 6. Evaluate on Test Set
+    y_pred = predict_price(model, X_test, bounds, features)
+
+    # Sample predictions
+    preview = pd.DataFrame({
+        'Actual Price (NPR)': y_test.values,
+        'Predicted Price (NPR)': y_pred,
+        'Error (NPR)': abs(y_test.values - y_pred)
+    })
+    print("\n🔍 Sample Predictions:")
+    print(preview.head())
+
+    # 7. Evaluation Metrics
+    r2 = r2_score(y_test, y_pred)
+    mae = mean_absolute_error(y_test, y_pred)
+    mse = mean_squared_error(y_test, y_pred)
+    rmse = np.sqrt(mse)
+
+    print("\n📊 Evaluation Metrics:")
+    print(f"R² Score: {r2:.4f}")
+    print(f"Mean Absolute Error: NPR {mae:,.0f}")
+    print(f"Mean Squared Error: NPR {mse:,.0f}")
+    print(f"Root Mean Squared Error: NPR {rmse:,.0f}")
+
+    # Publish the versioned bundle; running web workers pick it up without a restart
+    cv_rmse = next(row['rmse_mean'] for row in summary if row['model'] == published)
+    data_hash = hashlib.sha256(pd.util.hash_pandas_object(data, index=True).values.tobytes()).hexdigest()
+    version = save_bundle(
+        BUNDLE_PATH, model, bounds,
+        metrics={
+            'r2': float(r2), 'mae': float(mae), 'mse': float(mse), 'rmse': float(rmse),
+            'model': published, 'cv_rmse': cv_rmse,
+        },
+        data_hash=data_hash,
+    )
+    print(f"📦 Model bundle {version} written to {BUNDLE_PATH}")
+
+    if args.no_plot:
+        return
+
+    # 8. Visualization
+    plt.figure(figsize=(10, 6))
+    plt.scatter(y_test, y_pred, alpha=0.6, color='green', label='Predictions')
+    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 
+             'r--', label='Perfect Prediction')
+    plt.xlabel('Actual Price (NPR)')
+    plt.ylabel('Predicted Price (NPR)')
+    plt.title('Actual vs Predicted House Prices (NPR)')
+    plt.legend()
+    plt.grid(True)
+
+    # Format axes as NPR
+    plt.ticklabel_format(style='plain', axis='both')
+    plt.gca().get_xaxis().set_major_formatter(
+        FuncFormatter(lambda x, _: f'NPR {x:,.0f}'))
+    plt.gca().get_yaxis().set_major_formatter(
+        FuncFormatter(lambda y, _: f'NPR {y:,.0f}'))
+
+    plt.tight_layout()
+    plt.show()
+
+
+# Process-pool workers re-import this module, so training only runs as a script
+if __name__ == '__main__':
+    main()